@@ -1,15 +1,40 @@
 #!usr/bin/env python3
+import gc
 import time
+from bisect import bisect_left
+from contextlib import contextmanager
 from datetime import datetime
+from heapq import heappop, heappush
 from pprint import pformat, pprint
 
 
 class Rectangle(object):
-    
-    def __init__(self, b, h):
+
+    __slots__ = ('b', 'h', 'area', 'xy', 'rotatable', 'rotated')
+
+    def __init__(self, b, h, rotatable=False):
         self.b, self.h = b, h
         self.area = b * h
         self.xy = None
+        # Whether it may be planted turned by 90°, and whether it is.
+        self.rotatable = rotatable
+        self.rotated = False
+
+    def rotate(self):
+        self.b, self.h = self.h, self.b
+        self.rotated = not self.rotated
+
+    def least(self):
+        "Least width and height it may be planted with."
+        if self.rotatable:
+            s = min(self.b, self.h)
+            return s, s
+        return self.b, self.h
+
+    @staticmethod
+    def least_of(rects):
+        ls = [r.least() for r in rects]
+        return min(b for b, _ in ls), min(h for _, h in ls)
 
     def __repr__(self):
         return '[{}x{}@{}]'.format(self.b, self.h, self.xy)
@@ -37,22 +62,64 @@ class Rectangle(object):
 
 class Corner(object):
 
+    # No per-instance dict, since plans create lots of corners. Measured
+    # by `tracemalloc` on 64-bit CPython 3.11, a corner with its `xy`
+    # takes 240 bytes, rather than 296 bytes with a dict.
+    __slots__ = ('x', 'y', 'xy',
+                 'left', 'right', 'up', 'down', 'prev', 'next',
+                 'scene', 'rank', 'ikey', 'islot', 'memo')
+
     def __init__(self, x, y):
         self.x, self.y = x, y
         self.xy = x, y
-        for k in 'left right up down prev next'.split():
-            setattr(self, k, None)
+        self.left = self.right = self.up = self.down = None
+        self.prev = self.next = None
+        # The `Scene` owning this corner, notified after each plant.
+        self.scene = None
+        # Position in the chain, increasing along `next` from `top`.
+        self.rank = 0
+        # Book-keeping of `SlotIndex`.
+        self.ikey = None
+        self.islot = None
+        # Memo of `(shape, x_put, y_put)`, reset whenever pointers change.
+        self.memo = None
 
     def __repr__(self):
         # return 'N{}{}'.format(self.id, self.xy)
         return 'N{}'.format(self.xy)
 
+    # Check memos against fresh computation on every access.
+    debug = False
+
     @staticmethod
     def link(n1, n2):
         n1.next = n2
         n2.prev = n1
+        n1.memo = n2.memo = None
+
+    def _image(self):
+        "Pointers of `self`, as recorded in the undo journal of a `Scene`."
+        return (self, self.left, self.right, self.up, self.down,
+                self.prev, self.next)
+
+    def _memo(self):
+        m = self.memo
+        if m is None:
+            s = self._shape()
+            if s == 'L':   m = (s, self.x, self.y)
+            elif s == 'D': m = (s, self.x, self.down.y)
+            elif s == 'F': m = (s, self.left.x, self.y)
+            else:          m = (s, None, None)
+            self.memo = m
+        elif Corner.debug:
+            self.memo = None
+            assert m == self._memo(), (self, m, self.memo)
+        return m
 
     def shape(self):
+        return self._memo()[0]
+
+    def _shape(self):
         """Categorize the shape of a corner, which is not static due to
         the prev/next context.
 
@@ -74,24 +141,26 @@ class Corner(object):
             else:         return 'F'
 
     def x_put(self):
-        s = self.shape()
-        if s == 'L': return self.x
-        elif s == 'D': return self.x
-        elif s == 'F': return self.left.x
-        else: raise
+        x = self._memo()[1]
+        if x is None: raise
+        return x
 
     def y_put(self):
-        s = self.shape()
-        if s == 'L': return self.y
-        elif s == 'D': return self.down.y
-        elif s == 'F': return self.y
-        else: raise
+        y = self._memo()[2]
+        if y is None: raise
+        return y
 
 
     def plant(self, rect):
 
         b, h = rect.b, rect.h
 
+        # With the journal of the owning scene on, pointers of existing
+        # corners are recorded before being rewritten, see `Scene.rollback`.
+        journal = self.scene.journal if self.scene is not None else None
+        images = [] if journal is not None else None
+        xy0 = rect.xy
+
         # Determine whether `self` is still in the chain.
         # Different cases:
         # - `self` is a L-shaped corner:
@@ -101,6 +170,9 @@ class Corner(object):
 
             na = Corner(self.x, self.y + h)
             nb = Corner(self.x + b, self.y)
+            touched = [self, self.prev, self.next]
+            if images is not None:
+                images += [n._image() for n in touched]
 
             Corner.link(self.prev, na)
             Corner.link(na, nb)
@@ -121,6 +193,9 @@ class Corner(object):
             na = Corner(self.x, tar.y + h)
             nb = Corner(self.x + b, tar.y)
             nn = tar.next
+            touched = [tar, nn]
+            if images is not None:
+                images += [n._image() for n in touched]
             Corner.link(tar, na)
             Corner.link(na, nb)
             Corner.link(nb, nn)
@@ -139,6 +214,9 @@ class Corner(object):
             na = Corner(tar.x, self.y + h)
             nb = Corner(tar.x + b, self.y)
             np = tar.prev
+            touched = [np, tar]
+            if images is not None:
+                images += [n._image() for n in touched]
             Corner.link(np, na)
             Corner.link(na, nb)
             Corner.link(nb, tar)
@@ -152,6 +230,11 @@ class Corner(object):
         else:
             assert 0
 
+        na.scene = nb.scene = self.scene
+        # Every corner whose pointers get rewritten below is recorded,
+        # so that the owning scene may refresh what it derived from them.
+        touched += (na, nb)
+
         # Trial: No overlapping removal!
         # Drop one of the overlapping points!
         # if na.prev.y == na.y:
@@ -180,21 +263,28 @@ class Corner(object):
         # update others' right pointing
         n = na.prev
         while n.y < na.y:
+            if images is not None: images.append(n._image())
             n.right = na
+            touched.append(n)
             n = n.left.prev
         assert n.y >= na.y      # n overlooks na rightwards
         na.left = n.next
 
         # tour upwards
         # update others' down pointing
+        # `top` stops the tours, planting flush against the bounds.
         n = up0
-        while n.x <= nb.x:      # `nb` may be replaced during overlapping removal
+        while n.x <= nb.x and n.up is not n:   # `nb` may be replaced during overlapping removal
+            if images is not None: images.append(n._image())
             n.down = na
+            touched.append(n)
             n = n.up            # NEVER n == n.up
         assert n.x > na.x
         nb.up = n
-        while n.x <= nb.next.x:
+        while n.x <= nb.next.x and n.up is not n:
+            if images is not None: images.append(n._image())
             n.down = nb
+            touched.append(n)
             if n.shape() == 'T': break
             else: n = n.up
 
@@ -203,7 +293,9 @@ class Corner(object):
         # update others' up pointing
         n = nb.next
         while n.x < nb.x:
+            if images is not None: images.append(n._image())
             n.up = nb
+            touched.append(n)
             n = n.down.next
         assert n.x >= nb.x
         nb.down = n.prev
@@ -211,13 +303,17 @@ class Corner(object):
         # tour rightwards
         # update others' left pointing
         n = right0
-        while n.y <= na.y:
+        while n.y <= na.y and n.right is not n:
+            if images is not None: images.append(n._image())
             n.left = nb
+            touched.append(n)
             n = n.right         # NEVER n == n.right
-        assert n.y > nb.y + h
+        assert n.y > nb.y + h or n.right is n
         na.right = n
-        while n.y <= na.prev.y:
+        while n.y <= na.prev.y and n.right is not n:
+            if images is not None: images.append(n._image())
             n.left = na
+            touched.append(n)
             if n.shape() == 'T': break
             else: n = n.right
 
@@ -225,7 +321,19 @@ class Corner(object):
         for k in 'up down left right prev next'.split():
             assert getattr(na, k)
             assert getattr(nb, k)
-            
+
+        # Memos of the touched corners are outdated.
+        for n in touched:
+            n.memo = None
+
+        if journal is not None:
+            scene = self.scene
+            journal.append((rect, xy0, na, nb, images,
+                            (scene.x_bnd, scene.y_bnd, len(scene.dropped))))
+
+        if self.scene is not None:
+            self.scene._planted(rect, na, nb, touched)
+
         return na, nb
 
     @staticmethod
@@ -288,9 +396,10 @@ class Corner(object):
         return (dx, dy)
 
     def can_plant(self, rect, x_max, y_max):
-        
+
+        s, x_put, y_put = self._memo()
+
         # Mind the gap when aligning.
-        s = self.shape()
         if s == 'D':
             dy = self.y - self.down.y
             if dy >= rect.h:
@@ -301,8 +410,8 @@ class Corner(object):
                 return False
 
         # Not overstepping the bound!
-        if (self.x_put() + rect.b > x_max or
-            self.y_put() + rect.h > y_max):
+        if (x_put + rect.b > x_max or
+            y_put + rect.h > y_max):
             return False
     
         (sx, sy) = self.slot()
@@ -314,9 +423,393 @@ class Corner(object):
         return rect.area / (dx * dy)
 
 
+class Hole(object):
+    """Free region of `b x h` at `(x, y)` within the plan of a `Scene`,
+    left by `Scene.remove`. It offers the part of the `Corner` API used
+    for planting, thus `Scene.walk_find_best` may return it.
+
+    """
+
+    __slots__ = ('scene', 'x', 'y', 'b', 'h')
+
+    def __init__(self, scene, x, y, b, h):
+        self.scene = scene
+        self.x, self.y, self.b, self.h = x, y, b, h
+
+    def __repr__(self):
+        return 'H{}'.format((self.x, self.y, self.b, self.h))
+
+    def x_put(self):
+        return self.x
+
+    def y_put(self):
+        return self.y
+
+    def slot(self):
+        return (self.b, self.h)
+
+    def can_plant(self, rect, x_max, y_max):
+        return rect.b <= self.b and rect.h <= self.h
+
+    def slot_fill_rate(self, rect):
+        return rect.area / (self.b * self.h)
+
+    def plant(self, rect):
+        """Put `rect` at the bottom left and cut the rest in two, keeping
+        the greater piece whole.
+
+        """
+        scene = self.scene
+        if scene.journal is not None:
+            # Holes before, restored by `Scene.rollback`.
+            scene.journal.append((rect, rect.xy, None, None,
+                                  tuple(scene.holes), None))
+        scene.holes.remove(self)
+        x, y, b, h = self.x, self.y, self.b, self.h
+        rect.xy = (x, y)
+        if b - rect.b > h - rect.h:
+            pieces = [(x + rect.b, y, b - rect.b, h),
+                      (x, y + rect.h, rect.b, h - rect.h)]
+        else:
+            pieces = [(x + rect.b, y, b - rect.b, rect.h),
+                      (x, y + rect.h, b, h - rect.h)]
+        scene.holes += [Hole(scene, *p) for p in pieces if p[2] and p[3]]
+
+
+class SlotIndex(object):
+    """Index of live corners by their slot sizes.
+
+    Corners are kept ordered by `x + y` (never changing for a corner)
+    and split into blocks. Each block memorizes the greatest slot width
+    and height among its corners, so that querying for a rectangle
+    skips whole blocks in which it can fit nowhere.
+
+    A slot is refreshed only when `plant` rewrites pointers of its
+    corner. Other corners' slots may only shrink meanwhile, thus the
+    memorized slot is an upper bound and no viable corner is missed.
+
+    """
+
+    LOAD = 64
+
+    def __init__(self):
+        self.blocks = []        # lists of corners sorted by `ikey`
+        self.maxes = []         # `ikey` of the last corner per block
+        self.bdx = []           # greatest slot width per block
+        self.bdy = []           # greatest slot height per block
+        self.seq = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for blk in self.blocks:
+            yield from blk
+
+    def _locate(self, key):
+        i = bisect_left(self.maxes, key)
+        return min(i, len(self.blocks) - 1)
+
+    def _sum_up(self, i):
+        blk = self.blocks[i]
+        self.maxes[i] = blk[-1].ikey
+        self.bdx[i] = max(n.islot[0] for n in blk)
+        self.bdy[i] = max(n.islot[1] for n in blk)
+
+    def update(self, n, slot):
+        "Insert `n` or refresh its memorized slot."
+        if n.ikey is None:
+            n.ikey = (n.x + n.y, self.seq)
+            n.islot = slot
+            self.seq += 1
+            self.size += 1
+            if not self.blocks:
+                self.blocks.append([n])
+                self.maxes.append(n.ikey)
+                self.bdx.append(slot[0])
+                self.bdy.append(slot[1])
+                return
+            i = self._locate(n.ikey)
+            blk = self.blocks[i]
+            blk.insert(bisect_left([m.ikey for m in blk], n.ikey), n)
+            if len(blk) > 2 * self.LOAD:
+                half = blk[self.LOAD:]
+                del blk[self.LOAD:]
+                self.blocks.insert(i + 1, half)
+                self.maxes.insert(i + 1, None)
+                self.bdx.insert(i + 1, 0)
+                self.bdy.insert(i + 1, 0)
+                self._sum_up(i + 1)
+            self._sum_up(i)
+        else:
+            n.islot = slot
+            self._sum_up(self._locate(n.ikey))
+
+    def discard(self, n):
+        if n.ikey is None:
+            return
+        i = self._locate(n.ikey)
+        blk = self.blocks[i]
+        blk.remove(n)
+        n.ikey = n.islot = None
+        self.size -= 1
+        if blk:
+            self._sum_up(i)
+        else:
+            del self.blocks[i], self.maxes[i], self.bdx[i], self.bdy[i]
+
+    def fits(self, b, h, rotatable=False):
+        """Yield corners, by ascending `x + y`, whose slot may hold `b x h`,
+        or `h x b` as well if `rotatable`.
+
+        """
+        for blk, dx, dy in zip(self.blocks, self.bdx, self.bdy):
+            if (dx >= b and dy >= h) or (rotatable and dx >= h and dy >= b):
+                for n in blk:
+                    sx, sy = n.islot
+                    if (sx >= b and sy >= h) or (rotatable and sx >= h and sy >= b):
+                        yield n
+
+
+class NumpyEngine(object):
+    """Assess all indexed corners of a `Scene` at once with NumPy.
+
+    Coordinates, put positions, gaps and slot sizes of the corners in
+    `scene.index` are mirrored in arrays, so that `can_plant` and the
+    assessment of `Scene.walk_find_best` become one vectorized pass per
+    rectangle, choosing the same corner as the pure-Python search.
+
+    Slots are kept exact rather than as upper bounds: the slot of a D-
+    or F-shaped corner also reads `down.right` or `left.up`, thus such
+    corners are refreshed whenever a plant touches their `down` or
+    `left` corner.
+
+    """
+
+    def __init__(self, scene):
+        import numpy
+        self.np = numpy
+        self.scene = scene
+        self.rows = {}          # corner -> row
+        self.corners = []       # row -> corner, None if free
+        self.free = []
+        self.deps = {}          # corner -> corners whose slot reads it
+        self.dep_of = {}        # corner -> the corner its slot reads
+        self.cols = {k: numpy.zeros(0, dtype=numpy.int64)
+                     for k in ('x', 'y', 'xp', 'yp', 'gx', 'gy',
+                               'sx', 'sy', 'rank')}
+        self.live = numpy.zeros(0, dtype=bool)
+
+    def _grow(self):
+        np = self.np
+        n = max(64, 2 * len(self.corners))
+        for k, a in self.cols.items():
+            self.cols[k] = np.concatenate([a, np.zeros(n - len(a), dtype=a.dtype)])
+        self.live = np.concatenate([self.live, np.zeros(n - len(self.live), dtype=bool)])
+
+    def update(self, n):
+        "Mirror the current state of `n`."
+        i = self.rows.get(n)
+        if i is None:
+            if self.free:
+                i = self.free.pop()
+            else:
+                if len(self.corners) == len(self.live):
+                    self._grow()
+                i = len(self.corners)
+                self.corners.append(None)
+            self.rows[n] = i
+            self.corners[i] = n
+            self.live[i] = True
+
+        s, x_put, y_put = n._memo()
+        sx, sy = n.slot()
+        c = self.cols
+        c['x'][i] = n.x
+        c['y'][i] = n.y
+        c['xp'][i] = x_put
+        c['yp'][i] = y_put
+        # Gaps barring alignment, see `Corner.can_plant`.
+        c['gx'][i] = n.x - n.left.x if s == 'F' else -1
+        c['gy'][i] = n.y - n.down.y if s == 'D' else -1
+        c['sx'][i] = sx
+        c['sy'][i] = sy
+        c['rank'][i] = n.rank
+
+        dep = n.down if s == 'D' else n.left if s == 'F' else None
+        self._depend(n, dep)
+
+    def _depend(self, n, dep):
+        old = self.dep_of.pop(n, None)
+        if old is not None:
+            ds = self.deps[old]
+            ds.discard(n)
+            if not ds:
+                del self.deps[old]
+        if dep is not None:
+            self.dep_of[n] = dep
+            self.deps.setdefault(dep, set()).add(n)
+
+    def discard(self, n):
+        i = self.rows.pop(n, None)
+        if i is None:
+            return
+        self.corners[i] = None
+        self.live[i] = False
+        self.free.append(i)
+        self._depend(n, None)
+
+    def touched(self, ns):
+        "Refresh corners whose slot reads pointers of corners `ns`."
+        for m in ns:
+            for n in list(self.deps.get(m, ())):
+                self.update(n)
+
+    def rerank(self):
+        for n, i in self.rows.items():
+            self.cols['rank'][i] = n.rank
+
+    def find_best(self, rect):
+        "See `Scene.walk_find_best`."
+        np = self.np
+        scene = self.scene
+        b, h = rect.b, rect.h
+        x_bnd, y_bnd = scene.x_bnd, scene.y_bnd
+        m = len(self.corners)
+        c = {k: a[:m] for k, a in self.cols.items()}
+
+        ok = (self.live[:m] &
+              (c['gx'] < b) & (c['gy'] < h) &
+              (c['xp'] + b <= scene.x_max) & (c['yp'] + h <= scene.y_max) &
+              (c['sx'] >= b) & (c['sy'] >= h))
+        rows = np.flatnonzero(ok)
+        if not len(rows):
+            return scene.top.next
+
+        # Lexicographic minimum of the assessment, then of `rank`.
+        xb1 = np.maximum(c['xp'][rows] + b, x_bnd)
+        yb1 = np.maximum(c['yp'][rows] + h, y_bnd)
+        fr = rect.area / (c['sx'][rows] * c['sy'][rows])
+        keys = (xb1 + yb1,
+                xb1 * yb1,
+                c['x'][rows] + c['y'][rows],
+                -fr,
+                c['rank'][rows])
+        sel = np.arange(len(rows))
+        for key in keys:
+            k = key[sel]
+            sel = sel[k == k.min()]
+            if len(sel) == 1:
+                break
+        return self.corners[rows[sel[0]]]
+
+
+class Scorer(object):
+    """Assessment of planting a rectangle at a corner, smaller the better.
+
+    Placements keeping the bounding small come first by `x_bnd1 + y_bnd1`
+    (rather than `x_bnd1 * y_bnd1`, to avoid long-band stacking), then
+    by its area. Scorers differ in the tie-breakers that follow, see
+    `tie_break`. Register subclasses with `register_scorer`.
+
+    """
+
+    name = 'default'
+
+    # Whether the tie-breakers start with `n.x + n.y`, which allows
+    # `Scene.walk_find_best` to stop early.
+    by_distance = True
+
+    def key(self, n, rect, x_bnd1, y_bnd1):
+        return (x_bnd1 + y_bnd1, x_bnd1 * y_bnd1) + \
+            self.tie_break(n, rect, x_bnd1, y_bnd1)
+
+    def tie_break(self, n, rect, x_bnd1, y_bnd1):
+        # NEGATIVE fill rate in any slot
+        return (n.x + n.y, -n.slot_fill_rate(rect))
+
+
+SCORERS = {}
+
+
+def register_scorer(cls):
+    "Class decorator registering an instance of a `Scorer` by its name."
+    SCORERS[cls.name] = cls()
+    return cls
+
+
+register_scorer(Scorer)
+
+
+@register_scorer
+class AspectScorer(Scorer):
+    name = 'aspect'
+    by_distance = False
+
+    def tie_break(self, n, rect, x_bnd1, y_bnd1):
+        return (x_bnd1 / y_bnd1 + y_bnd1 / x_bnd1,
+                n.x + n.y, -n.slot_fill_rate(rect))
+
+
+@register_scorer
+class SquareScorer(Scorer):
+    name = 'square'
+    by_distance = False
+
+    def tie_break(self, n, rect, x_bnd1, y_bnd1):
+        return (abs(x_bnd1 - y_bnd1),
+                n.x + n.y, -n.slot_fill_rate(rect))
+
+
+@register_scorer
+class MaxDistScorer(Scorer):
+    "p-1 distance from the origin"
+    name = 'max_dist'
+    by_distance = False
+
+    def tie_break(self, n, rect, x_bnd1, y_bnd1):
+        return (max(n.x, n.y), -n.slot_fill_rate(rect))
+
+
+@register_scorer
+class MinDistScorer(Scorer):
+    name = 'min_dist'
+    by_distance = False
+
+    def tie_break(self, n, rect, x_bnd1, y_bnd1):
+        return (min(n.x, n.y), -n.slot_fill_rate(rect))
+
+
+@register_scorer
+class FillScorer(Scorer):
+    "Best fit before closeness to the origin."
+    name = 'fill'
+    by_distance = False
+
+    def tie_break(self, n, rect, x_bnd1, y_bnd1):
+        return (-n.slot_fill_rate(rect), n.x + n.y)
+
+
+@contextmanager
+def gc_paused():
+    """Keep the cyclic garbage collector off meanwhile. Corners are bound
+    in reference cycles by their pointers, which the collector would
+    otherwise traverse over and over while a scene grows.
+
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
 class Scene(object):
 
-    def __init__(self, x_max, y_max):
+    def __init__(self, x_max, y_max, engine=None, scorer='default'):
 
         self.x_max = x_max
         self.y_max = y_max
@@ -337,54 +830,433 @@ class Scene(object):
         top.next = top.prev = ori
         ori.next = ori.prev = top
 
+        top.scene = ori.scene = self
+
         self.top = top
         self.ori = ori
 
+        # Bounding of all planted rectangles, kept up to date by
+        # `_planted` rather than walking the chain on demand.
+        self.x_bnd = 0
+        self.y_bnd = 0
+
+        # Ranks order corners along the chain, which resolves ties
+        # between equally assessed corners as walking the chain does.
+        top.rank = 0
+        ori.rank = Scene.RANK_GAP
+        self.index = SlotIndex()
+        self.index.update(ori, ori.slot())
+
+        # Corners along the chain whose slot is narrower or lower than
+        # any rectangle expected are retired from `index`. Since slots of
+        # untouched corners never grow, they are revisited only when a
+        # plant touches them or smaller rectangles are expected.
+        self.b_min = self.h_min = 1
+        self.retired = {}
+        # Corners dropped from the chain, for `close`.
+        self.dropped = []
+
+        # Undo journal of plants since the earliest `checkpoint`, None
+        # if off. Each entry is `(rect, xy, na, nb, images, state)` with
+        # the former position of `rect`, the corners created, pointers
+        # of existing corners and the rest of a checkpoint before the
+        # plant. Entries before position `journal_base` have been
+        # dropped by `forget`.
+        self.journal = None
+        self.journal_base = 0
+
+        # Seconds taken by each `add`, for `latency`.
+        self.latencies = []
+        # `Hole`s within the plan, left by `remove`.
+        self.holes = []
+        # Times `_rerank` renumbered all corners.
+        self.reranks = 0
+
+        # The `Scorer` assessing placements, or its registered name.
+        self.scorer = SCORERS[scorer] if isinstance(scorer, str) else scorer
+
+        # Optionally `'numpy'` for assessing corners by `NumpyEngine`.
+        self.engine = None
+        if engine == 'numpy':
+            assert type(self.scorer) is Scorer, 'Only the default scorer'
+            self.engine = NumpyEngine(self)
+            self.engine.update(ori)
+        else:
+            assert engine is None, engine
+
+    RANK_GAP = 1 << 32
+
+    def _rerank(self):
+        self.reranks += 1
+        for i, n in enumerate(self.top.walk()):
+            n.rank = i * Scene.RANK_GAP
+        if self.engine:
+            self.engine.rerank()
+
+    def _planted(self, rect, na, nb, touched):
+        "Called by `Corner.plant` after `rect` is installed."
+        # `nb` carries the right edge and `na` the top edge of `rect`.
+        if nb.x > self.x_bnd:
+            self.x_bnd = nb.x
+        if na.y > self.y_bnd:
+            self.y_bnd = na.y
+
+        # `na` and `nb` are adjacent in the chain.
+        r0 = na.prev.rank
+        r1 = nb.next.rank if nb.next is not self.top else r0 + 3 * Scene.RANK_GAP
+        if r1 - r0 < 3:
+            self._rerank()
+        else:
+            na.rank = r0 + (r1 - r0) // 3
+            nb.rank = r0 + 2 * (r1 - r0) // 3
+
+        touched = dict.fromkeys(touched)
+        for n in touched:
+            if n is not self.top:
+                self._review(n)
+        if self.engine:
+            self.engine.touched(touched)
+        self.last_touched = touched
+
+    def _review(self, n):
+        "Index `n` or retire it according to its slot."
+        engine = self.engine
+        if n.prev.next is not n:
+            # dropped from the chain
+            self.index.discard(n)
+            self.retired.pop(n, None)
+            self.dropped.append(n)
+            if engine:
+                engine.discard(n)
+            return
+        slot = n.slot()
+        if slot[0] >= self.b_min and slot[1] >= self.h_min:
+            self.index.update(n, slot)
+            self.retired.pop(n, None)
+            if engine:
+                engine.update(n)
+        else:
+            self.index.discard(n)
+            self.retired[n] = None
+            if engine:
+                engine.discard(n)
+
+    def expect(self, b_min, h_min):
+        """Declare the least width and height of rectangles to come, which
+        allows retiring corners with smaller slots.
+
+        """
+        lower = b_min < self.b_min or h_min < self.h_min
+        self.b_min, self.h_min = b_min, h_min
+        if lower:
+            for n in list(self.retired):
+                self._review(n)
+        else:
+            for n in list(self.index):
+                self._review(n)
+
     def xy_bounding(self):
-        x_bnd = 0
-        y_bnd = 0
-        w = self.top.walk()
-        next(w)
-        for n in w:
-            if n.x > x_bnd:
-                x_bnd = n.x
-            if n.y > y_bnd:
-                y_bnd = n.y
-        return (x_bnd, y_bnd)
-            
+        return (self.x_bnd, self.y_bnd)
+
+    @property
+    def gap(self):
+        """Relative gap of the bounding area to `lower_bound` of `rects`,
+        beyond which no plan can improve.
+
+        """
+        return 1 - lower_bound(self.rects) / (self.x_bnd * self.y_bnd)
+
+    def checkpoint(self):
+        """Turn on the undo journal and return a token of the current
+        state, to be passed to `rollback`.
+
+        """
+        if self.journal is None:
+            self.journal = []
+        return (self.journal_base + len(self.journal),
+                self.x_bnd, self.y_bnd, len(self.dropped))
+
+    def rollback(self, cp):
+        """Undo plants made since checkpoint `cp`, in time proportional to
+        the pointers they rewrote. Checkpoints taken after `cp` become
+        invalid.
+
+        """
+        pos, x_bnd, y_bnd, n_dropped = cp
+        journal = self.journal
+        engine = self.engine
+        restored = {}
+        removed = set()
+        assert pos >= self.journal_base, 'Forgotten checkpoint'
+        while self.journal_base + len(journal) > pos:
+            rect, xy, na, nb, images, _ = journal.pop()
+            rect.xy = xy
+            if na is None:
+                # A grid block member, or a plant in a hole, with the
+                # holes before.
+                if images:
+                    self.holes = list(images)
+                continue
+            for n in (na, nb):
+                self.index.discard(n)
+                self.retired.pop(n, None)
+                if engine:
+                    engine.discard(n)
+                n.left = n.right = n.up = n.down = n.prev = n.next = None
+                n.scene = n.memo = None
+                removed.add(n)
+            # The earliest image of a corner is restored last.
+            for n, l, r, u, d, p, x in reversed(images):
+                n.left, n.right, n.up, n.down, n.prev, n.next = l, r, u, d, p, x
+                n.memo = None
+                restored[n] = None
+        self.x_bnd, self.y_bnd = x_bnd, y_bnd
+        del self.dropped[n_dropped:]
+
+        restored = [n for n in restored if n not in removed]
+        for n in restored:
+            if n is not self.top:
+                self._review(n)
+        if engine:
+            engine.touched(restored)
+
+    def remove(self, rect):
+        """Take planted `rect` out of the plan, returning whether pointers
+        are restored as if it had never been planted.
+
+        They are if the journal reaches back to the plant of `rect`, and
+        the rectangles planted since can be replayed at their positions
+        without it: the plants since are rolled back and replayed, which
+        takes time proportional to them rather than to all rectangles.
+        Unless so, e.g. if a later rectangle rests on `rect` or the
+        journal is off, its region becomes one of `holes`, which
+        `walk_find_best` fills first. Removals themselves are not
+        journaled.
+
+        """
+        if rect.xy is None:
+            raise Exception('Rectangle not planted: {}'.format(rect))
+        if not hasattr(self, 'planted'):
+            self.planted = sum(r.area for r in self.rects if r.xy)
+        journal = self.journal or []
+        j = len(journal) - 1
+        while j >= 0 and journal[j][0] is not rect:
+            j -= 1
+        restored = False
+        if j >= 0 and all(e[5] for e in journal[j:]):
+            redo = self._snapshot(j)
+            later = [(e[0], e[0].xy) for e in journal[j + 1:]]
+            self.rollback((self.journal_base + j,) + journal[j][5])
+            for r, xy in later:
+                r.xy = xy
+            cp = self.checkpoint()
+            restored = not self.replay([r for r, _ in later])
+            if not restored:
+                self.rollback(cp)
+                self._redo(redo)
+        if not restored:
+            self._hole(rect.xy[0], rect.xy[1], rect.b, rect.h)
+        rect.xy = None
+        self.rects.remove(rect)
+        self.planted -= rect.area
+        if self.x_bnd and self.y_bnd:
+            self.occu_rate = self.planted / (self.x_bnd * self.y_bnd)
+        return restored
+
+    def _hole(self, x, y, b, h):
+        "Add a hole, merged with those sharing a whole side with it."
+        merged = True
+        while merged:
+            merged = False
+            for o in self.holes:
+                if o.x == x and o.b == b and (o.y + o.h == y or y + h == o.y):
+                    y, h = min(y, o.y), h + o.h
+                elif o.y == y and o.h == h and (o.x + o.b == x or x + b == o.x):
+                    x, b = min(x, o.x), b + o.b
+                else:
+                    continue
+                self.holes.remove(o)
+                merged = True
+                break
+        self.holes.append(Hole(self, x, y, b, h))
+
+    def _snapshot(self, j):
+        """State after the journal entries from `j` on, for `_redo` after
+        rolling them back.
+
+        """
+        entries = self.journal[j:]
+        ns = {}
+        for rect, _, na, nb, images, _ in entries:
+            for n in [img[0] for img in images] + [na, nb]:
+                ns[n] = None
+        n_dropped = entries[0][5][2]
+        return (entries, [n._image() + (n.rank,) for n in ns],
+                [(e[0], e[0].xy, e[0].rotated) for e in entries],
+                self.dropped[n_dropped:],
+                self.x_bnd, self.y_bnd, self.reranks)
+
+    def _redo(self, snapshot):
+        """Restore the state of `snapshot` from the state rolled back to
+        where it was taken, without searching again.
+
+        """
+        entries, images, xys, dropped, x_bnd, y_bnd, reranks = snapshot
+        for n, l, r, u, d, p, x, rank in images:
+            n.left, n.right, n.up, n.down, n.prev, n.next = l, r, u, d, p, x
+            n.rank = rank
+            n.scene = self
+            n.memo = None
+        for rect, xy, rotated in xys:
+            rect.xy = xy
+            if rect.rotated != rotated:
+                rect.rotate()
+        self.journal += entries
+        self.dropped += dropped
+        self.x_bnd, self.y_bnd = x_bnd, y_bnd
+        if self.reranks != reranks:
+            self._rerank()
+        engine = self.engine
+        ns = [img[0] for img in images if img[0] is not self.top]
+        for n in ns:
+            if n.prev.next is not n:
+                # dropped from the chain
+                self.index.discard(n)
+                self.retired.pop(n, None)
+                if engine:
+                    engine.discard(n)
+            else:
+                self._review(n)
+        if engine:
+            engine.touched([n for n in ns if n.prev.next is n])
+
+    def forget(self, cp):
+        "Drop the journal before checkpoint `cp`, which then is the earliest."
+        pos = cp[0]
+        del self.journal[:pos - self.journal_base]
+        self.journal_base = pos
+
+    def release(self):
+        "Turn off the undo journal, invalidating all checkpoints."
+        self.journal = None
+        self.journal_base = 0
+
+    def close(self):
+        """Break the reference cycles among corners and the scene, so that
+        they are freed right away by reference counting rather than by
+        the cyclic garbage collector. The scene is unusable afterwards,
+        while planted rectangles keep their positions.
+
+        """
+        ns = set()
+        stack = [self.top] + self.dropped
+        while stack:
+            n = stack.pop()
+            if n is not None and n not in ns:
+                ns.add(n)
+                stack += (n.left, n.right, n.up, n.down, n.prev, n.next)
+        for n in ns:
+            n.left = n.right = n.up = n.down = n.prev = n.next = None
+            n.scene = n.memo = None
+        self.index = SlotIndex()
+        self.retired = {}
+        self.dropped = []
+        self.holes = []
+        self.journal = None
+        self.journal_base = 0
+        self.engine = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
     def walk_find_best(self, rect):
+        """The best corner to plant `rect` at. A rotatable `rect` is turned
+        to the better orientation, both being assessed in the same walk.
 
-        x_bnd, y_bnd = self.xy_bounding()
+        """
+        # A hole holding `rect` keeps the bounding, and is filled first.
+        if self.holes:
+            hole = self._find_hole(rect)
+            if hole is not None:
+                return hole
 
-        def assess(n):
-            "Smaller the better."
-            x_bnd1 = max(n.x_put() + rect.b, x_bnd)
-            y_bnd1 = max(n.y_put() + rect.h, y_bnd)
-            fr = n.slot_fill_rate(rect)
-            # Heuristics
-            return (
-                x_bnd1 + y_bnd1, # rather than (x_bnd1 * y_bnd1) to avoid long-band stacking
-                x_bnd1 * y_bnd1,
-                # x_bnd1 / y_bnd1 + y_bnd1 / x_bnd1, # aspect ratio
-                # abs(x_bnd1 - y_bnd1),
-                n.x + n.y,
-                # max(n.x, n.y), # p-1 distance from the origin
-                # min(n.x, n.y), # p-1 distance from the origin
-                -fr,
-            )           # NEGATIVE fill rate in any slot
+        b, h = rect.least()
+        if b < self.b_min or h < self.h_min:
+            self.expect(min(b, self.b_min), min(h, self.h_min))
 
-        w = self.top.walk()
-        next(w)                 # ignore `top`
+        if self.engine and not rect.rotatable:
+            return self.engine.find_best(rect)
 
         try:
-            n_best = min((n for n in w if n.can_plant(rect, self.x_max, self.y_max)),
-                        default=self.top.next,
-                        key=assess)
-            return n_best
+            best = self._search(rect, 1)
+            if not best:
+                return self.top.next
+            k, n = best[0]
+            if k[2] != rect.rotated:
+                rect.rotate()
+            return n
         except TypeError as e:
             print('No viable corner to put a rectangle.')
             print('NEED LOGGING HERE.')
 
+    def candidates(self, rect, m):
+        """The `m` best `(key, corner)` for `rect`, best first. The last
+        item of `key` tells whether `rect` is to be rotated there.
+
+        """
+        b, h = rect.least()
+        if b < self.b_min or h < self.h_min:
+            self.expect(min(b, self.b_min), min(h, self.h_min))
+        return self._search(rect, m)
+
+    def _search(self, rect, m):
+
+        x_bnd, y_bnd = self.x_bnd, self.y_bnd
+        scorer = self.scorer
+
+        def assess(n, rect):
+            "Smaller the better."
+            x_bnd1 = max(n.x_put() + rect.b, x_bnd)
+            y_bnd1 = max(n.y_put() + rect.h, y_bnd)
+            return scorer.key(n, rect, x_bnd1, y_bnd1)
+
+        # Orientations to assess, with the rotation of `rect` each one
+        # means, the unrotated one preferred on ties.
+        turns = [(rect, rect.rotated)]
+        if rect.rotatable and rect.b != rect.h:
+            turns.append((Rectangle(rect.h, rect.b), not rect.rotated))
+
+        # Only corners whose slot may hold `rect` are visited, by
+        # ascending `x + y`. `rank` comes next to prefer the corner met
+        # first along the chain.
+        cands = self.index.fits(rect.b, rect.h, len(turns) > 1)
+
+        # No placement assesses better than keeping the bounding, after
+        # which `x + y` decides by `Scorer.by_distance`. So once the m-th
+        # best one so far keeps the bounding, corners with greater `x + y`
+        # can be left out, making the result the same as over all corners.
+        keep = (x_bnd + y_bnd, x_bnd * y_bnd) if scorer.by_distance else None
+
+        best = []               # sorted `(key, corner)`
+        keys = []
+        for n in cands:
+            if (len(keys) == m and
+                keys[-1][0][:2] == keep and
+                n.x + n.y > keys[-1][0][2]):
+                break
+            for r, rotated in turns:
+                if n.can_plant(r, self.x_max, self.y_max):
+                    k = (assess(n, r), n.rank, rotated)
+                    if len(keys) < m or k < keys[-1]:
+                        i = bisect_left(keys, k)
+                        keys.insert(i, k)
+                        best.insert(i, (k, n))
+                        del keys[m:], best[m:]
+        return best
+
     def validate_linking(self):
         for a, b in zip(self.top.walk(), self.top.next.walk()):
             if a != b.prev:
@@ -396,17 +1268,436 @@ class Scene(object):
         self.rects = sorted(rects, reverse=True, **sortkw)
         # self.rects = rects[:]
 
-    def plan(self):
+    # Least and greatest numbers of identical rectangles in a grid block.
+    BATCH_MIN = 4
+    BATCH_MAX = 256
+
+    def _grids(self, b, h, k):
+        "Columns and rows of grid blocks to try for `k` rectangles."
+        # about square
+        c = max(1, min(k, round((k * h / b) ** 0.5)))
+        yield c, k // c
+        # a strip along the shorter side of the bounding
+        if self.x_bnd and self.y_bnd:
+            if self.x_bnd <= self.y_bnd:
+                r = max(1, min(k, self.y_bnd // h))
+                yield max(1, k // r), r
+            else:
+                c = max(1, min(k, self.x_bnd // b))
+                yield c, max(1, k // c)
+
+    def plant_grid(self, rects):
+        """Plant identical `rects` as one grid block, which takes a search
+        per tried block shape and a single plant. Returns the number of
+        rectangles planted, as the grid may leave some of `rects` over.
+
+        Of the block shapes, the one enlarging the bounding area least
+        per planted area wins.
+
+        """
+        b, h = rects[0].b, rects[0].h
+        k = min(len(rects), Scene.BATCH_MAX)
+        area0 = self.x_bnd * self.y_bnd
+        while k > 1:
+            best = None
+            for c, r in self._grids(b, h, k):
+                blk = Rectangle(c * b, r * h)
+                n = self.walk_find_best(blk)
+                if n.can_plant(blk, self.x_max, self.y_max):
+                    x_bnd1 = max(n.x_put() + blk.b, self.x_bnd)
+                    y_bnd1 = max(n.y_put() + blk.h, self.y_bnd)
+                    key = (x_bnd1 * y_bnd1 - area0) / blk.area
+                    if best is None or key < best[0]:
+                        best = (key, n, blk, c, r)
+            if best:
+                _, n, blk, c, r = best
+                n.plant(blk)
+                x0, y0 = blk.xy
+                if self.journal is not None:
+                    self.journal += [(rect, rect.xy, None, None, (), None)
+                                     for rect in rects[:c * r]]
+                for i, rect in enumerate(rects[:c * r]):
+                    rect.xy = (x0 + (i % c) * b, y0 + (i // c) * h)
+                return c * r
+            k //= 2
+        self.walk_find_best(rects[0]).plant(rects[0])
+        return 1
+
+    # Positions between checkpoints of `improve`, and the most pointer
+    # images it keeps journaled.
+    IMPROVE_INTERVAL = 32
+    IMPROVE_BUDGET = 1 << 18
+
+    def improve(self, iters, seed=0, deadline=None):
+        """Plant `rects`, then search for a better order of them by `iters`
+        random swaps and moves, keeping those which shrink the bounding.
+        Trials stop early at `deadline`, in seconds since the epoch.
+
+        Checkpoints are taken every `IMPROVE_INTERVAL` positions. A trial
+        rolls back to the last one before the first position it changes
+        and replays from there, so the unchanged prefix is not planned
+        again, and a rejected trial restores the plan it rolled back by
+        `_redo`. Trials are confined to the last positions whose journal
+        keeps within `IMPROVE_BUDGET` pointer images, and the first
+        position is drawn toward the end, the distance to which is
+        log-uniform, so trials plant about `n / log n` of `n` positions.
+
+        """
+        import random
+        rnd = random.Random(seed)
+        rects = self.rects
+        k = Scene.IMPROVE_INTERVAL
+        cps = []                # before planting `rects[i * k]`
+
+        def replay(c, bound=None):
+            """Plant from checkpoint `c` on. The bounding area, or None if
+            failing or reaching `bound`, as the bounding never shrinks.
+
+            """
+            del cps[c:]
+            for i in range(c * k, len(rects)):
+                if i % k == 0:
+                    cps.append(self.checkpoint())
+                r = rects[i]
+                n = self.walk_find_best(r)
+                if n is None or not n.can_plant(r, self.x_max, self.y_max):
+                    return None
+                n.plant(r)
+                if bound is not None and self.x_bnd * self.y_bnd >= bound:
+                    return None
+            return self.x_bnd * self.y_bnd
+
+        def move(i, j, swap):
+            if swap:
+                rects[i], rects[j] = rects[j], rects[i]
+            else:
+                rects.insert(j, rects.pop(i))
+
+        def unmove(i, j, swap):
+            if swap:
+                rects[i], rects[j] = rects[j], rects[i]
+            else:
+                rects.insert(i, rects.pop(j))
+
+        if rects:
+            self.expect(*Rectangle.least_of(rects))
+        area = replay(0)
+        assert area is not None, 'No viable corner to put a rectangle.'
+
+        # Keep the journal of the last checkpoints within budget.
+        lo = len(cps)
+        size = 0
+        ends = [cp[0] for cp in cps[1:]] + [self.journal_base + len(self.journal)]
+        while lo > 0:
+            j0 = cps[lo - 1][0] - self.journal_base
+            j1 = ends[lo - 1] - self.journal_base
+            size += sum(len(e[4]) + 2 for e in self.journal[j0:j1])
+            if size > Scene.IMPROVE_BUDGET:
+                break
+            lo -= 1
+        if lo < len(cps):
+            self.forget(cps[lo])
+
+        for _ in range(iters if len(rects) - lo * k >= 2 else 0):
+            if deadline is not None and time.time() >= deadline:
+                break
+            i = len(rects) - 1 - int((len(rects) - lo * k - 1) ** rnd.random())
+            j = rnd.randrange(i + 1, len(rects))
+            swap = rnd.random() < 0.5
+            c = i // k
+            redo = self._snapshot(cps[c][0] - self.journal_base)
+            kept = cps[c:]
+            self.rollback(cps[c])
+            move(i, j, swap)
+            a = replay(c, area)
+            if a is not None:
+                area = a
+            else:
+                self.rollback(cps[c])
+                unmove(i, j, swap)
+                self._redo(redo)
+                cps[c:] = kept
+
+        self.release()
+        self.occu_rate = sum(r.area for r in rects) / area
+        return self.occu_rate
+
+    # Steps a beam may run ahead of the plan committed by all beams.
+    BEAM_HORIZON = 8
+
+    def beam(self, k):
+        """Plant `rects` by beam search, keeping the `k` best partial plans
+        by the bounding, each expanded by the `k` best corners for the
+        next rectangle.
+
+        Beams share the committed plan, and differ in short paths of
+        steps replayed on it with the undo journal. A step refers to a
+        committed corner, or to one planted by an earlier step of its path
+        as `(step, 0 for na or 1 for nb)`. Steps shared by all beams get
+        committed, and so does the first step of the best beam, with the
+        beams disagreeing dropped, after `BEAM_HORIZON` steps.
+
+        The greedy plan is kept if the beams end up with a greater
+        bounding area.
+
+        """
+        rects = self.rects
+        if rects:
+            self.expect(*Rectangle.least_of(rects))
+        start = self.checkpoint()
+        turns = [r.rotated for r in rects]
+
+        def greedy():
+            for r, rotated in zip(rects, turns):
+                if r.rotated != rotated:
+                    r.rotate()
+            for r in rects:
+                self.walk_find_best(r).plant(r)
+
+        greedy()
+        floor = self.x_bnd * self.y_bnd
+        self.rollback(start)
+        for r, rotated in zip(rects, turns):
+            if r.rotated != rotated:
+                r.rotate()
+
+        root = self.checkpoint()
+        done = 0
+        beams = [((), [])]      # `(score, path)` best first
+
+        def replay(path):
+            "Plant `path` on the committed plan, returning corners planted."
+            self.rollback(root)
+            made = []
+            for i, (ref, rotated) in enumerate(path):
+                n = made[ref[0]][ref[1]] if type(ref) is tuple else ref
+                r = rects[done + i]
+                if r.rotated != rotated:
+                    r.rotate()
+                made.append(n.plant(r))
+            return made
+
+        for i in range(len(rects)):
+            rect = rects[i]
+            children = []
+            for score, path in beams:
+                made = replay(path)
+                refs = {m: (t, w) for t, nanb in enumerate(made)
+                        for w, m in enumerate(nanb)}
+                for j, (key, n) in enumerate(self.candidates(rect, k)):
+                    rotated = key[2]
+                    b, h = (rect.b, rect.h) if rotated == rect.rotated else (rect.h, rect.b)
+                    x_bnd1 = max(n.x_put() + b, self.x_bnd)
+                    y_bnd1 = max(n.y_put() + h, self.y_bnd)
+                    children.append(((x_bnd1 + y_bnd1, x_bnd1 * y_bnd1,
+                                      (score[2] if score else 0) + j),
+                                     path + [(refs.get(n, n), rotated)]))
+            if not children:
+                raise Exception('No viable corner to put a rectangle.')
+            children.sort(key=lambda c: c[0])
+            beams = children[:k]
+
+            # Commit steps shared by all beams, or forced by the horizon.
+            c = 0
+            paths = [path for _, path in beams]
+            while c < len(paths[0]) and all(p[c] == paths[0][c] for p in paths):
+                c += 1
+            if c == 0 and len(paths[0]) > Scene.BEAM_HORIZON:
+                beams = [b for b in beams if b[1][0] == paths[0][0]]
+                c = 1
+            if c:
+                made = replay(paths[0][:c])
+                root = self.checkpoint()
+                done += c
+
+                def shift(ref):
+                    if type(ref) is not tuple:
+                        return ref
+                    t, w = ref
+                    return made[t][w] if t < c else (t - c, w)
+
+                beams = [(score, [(shift(ref), rotated) for ref, rotated in path[c:]])
+                         for score, path in beams]
+
+        replay(beams[0][1])
+        if self.x_bnd * self.y_bnd > floor:
+            self.rollback(start)
+            greedy()
+        self.release()
+        self.occu_rate = sum(r.area for r in rects) / (self.x_bnd * self.y_bnd)
+        return self.occu_rate
+
+    def probe(self):
+        """Plant `rects` one by one within the bounds, telling whether all
+        of them fit. Gives up as soon as the area left in the container
+        looks too small for the rest of them: the free area inside the
+        bounding, and beyond it only where the rest may still reach.
+
+        """
+        rects = self.rects
+        if not rects:
+            return True
+        rest = sum(r.area for r in rects)
+        if rest > self.x_max * self.y_max:
+            return False
+        for r in rects:
+            if ((r.b > self.x_max or r.h > self.y_max) and
+                not (r.rotatable and r.h <= self.x_max and r.b <= self.y_max)):
+                return False
+        # Least width and height among `rects[i:]`.
+        b_mins, h_mins = [], []
+        b_min = h_min = float('inf')
+        for r in reversed(rects):
+            b, h = r.least()
+            b_min, h_min = min(b_min, b), min(h_min, h)
+            b_mins.append(b_min)
+            h_mins.append(h_min)
+        b_mins.reverse()
+        h_mins.reverse()
+        self.expect(b_mins[0], h_mins[0])
+
+        placed = 0
+        for i, r in enumerate(rects):
+            dx = self.x_max - self.x_bnd
+            dy = self.y_max - self.y_bnd
+            room = self.x_bnd * self.y_bnd - placed
+            if dx >= b_mins[i]:
+                room += dx * self.y_bnd
+            if dy >= h_mins[i]:
+                room += self.x_max * dy
+            if rest > room:
+                return False
+            n = self.walk_find_best(r)
+            if n is None or not n.can_plant(r, self.x_max, self.y_max):
+                return False
+            n.plant(r)
+            rest -= r.area
+            placed += r.area
+        self.occu_rate = placed / (self.x_bnd * self.y_bnd)
+        return True
+
+    def add(self, rect, since=None):
+        """Plant `rect` right away, for rectangles arriving one at a time
+        rather than planned after `prepare`. The search visits indexed
+        corners only, as `plan` does. Returns False if there is no room
+        for `rect` in the container.
+
+        Seconds taken, since the time `since` if given, are kept in
+        `latencies`.
+
+        """
+        t = time.perf_counter() if since is None else since
+        if not hasattr(self, 'rects'):
+            self.rects = []
+        if not hasattr(self, 'planted'):
+            self.planted = sum(r.area for r in self.rects if r.xy)
+        n = self.walk_find_best(rect)
+        ok = n.can_plant(rect, self.x_max, self.y_max)
+        if ok:
+            n.plant(rect)
+            self.rects.append(rect)
+            self.planted += rect.area
+            self.occu_rate = self.planted / (self.x_bnd * self.y_bnd)
+        self.latencies.append(time.perf_counter() - t)
+        return ok
+
+    def _find_hole(self, rect):
+        "The least of `holes` holding `rect`, which is turned if need be."
+        best = None
+        for hole in self.holes:
+            for rotated in ((False, True) if rect.rotatable else (False,)):
+                b, h = (rect.h, rect.b) if rotated else (rect.b, rect.h)
+                if (b <= hole.b and h <= hole.h and
+                    (best is None or hole.b * hole.h < best[0].b * best[0].h)):
+                    best = (hole, rotated)
+        if best is None:
+            return None
+        if best[1]:
+            rect.rotate()
+        return best[0]
+
+    def replay(self, rects):
+        """Plant `rects` at their positions `xy` again, each one as soon as
+        some corner puts it there, which holds for a former plan of the
+        same container. Only corners touched by a plant are checked again,
+        since slots of the others do not grow. Returns the rectangles left
+        over, whose `xy` are reset, including all but the first of those
+        at the same position.
+
+        """
+        todo = {}
+        left = []
+        for r in rects:
+            if r.xy in todo:
+                left.append(r)
+            else:
+                todo[r.xy] = r
+        work = list(self.index)
+        while work and todo:
+            n = work.pop()
+            if n is self.top or n.prev.next is not n:
+                continue
+            r = todo.get((n.x_put(), n.y_put()))
+            if r is not None and n.can_plant(r, self.x_max, self.y_max):
+                del todo[r.xy]
+                n.plant(r)
+                work += self.last_touched
+        left += todo.values()
+        for r in left:
+            r.xy = None
+        return left
+
+    def latency(self, *ps):
+        """Percentiles `ps` (50, 90 and 99 if none) of `latencies`, by `p`,
+        being None before any `add`.
+
+        """
+        ls = sorted(self.latencies)
+        return {p: ls[min(len(ls) - 1, len(ls) * p // 100)] if ls else None
+                for p in ps or (50, 90, 99)}
+
+    def plan(self, batch=False, pause_gc=False, improve=0, beam=0):
+        """Plant `rects` one by one. With `batch`, runs of identical
+        rectangles are rather planted as grid blocks by `plant_grid`.
+        With `pause_gc`, the cyclic garbage collector is off meanwhile.
+        With `improve`, so many trials of `improve` follow. With `beam`,
+        rectangles are rather planted by `beam` search of such width.
+
+        """
+        if pause_gc:
+            with gc_paused():
+                return self.plan(batch=batch, improve=improve, beam=beam)
+        if beam:
+            assert not batch and not improve
+            return self.beam(beam)
+        if improve:
+            assert not batch, 'Grid blocks are not reordered'
+            return self.improve(improve)
         assert hasattr(self, 'rects')
         rects = self.rects
+        if rects:
+            self.expect(*Rectangle.least_of(rects))
         try:
             sa = 0
-            for r in rects:
+            i = 0
+            while i < len(rects):
+                r = rects[i]
+                if batch:
+                    j = i + 1
+                    while (j < len(rects) and
+                           rects[j].b == r.b and rects[j].h == r.h):
+                        j += 1
+                    if j - i >= Scene.BATCH_MIN:
+                        k = self.plant_grid(rects[i:j])
+                        sa += k * r.area
+                        i += k
+                        continue
                 n = self.walk_find_best(r)
                 n.plant(r)
                 # self.validate_linking()
                 sa += r.area
-            x_bnd, y_bnd = self.xy_bounding()
+                i += 1
+            x_bnd, y_bnd = self.x_bnd, self.y_bnd
             occu_rate = (sa) / (x_bnd * y_bnd)
             # print('Success with occu_rate: ', occu_rate)
             self.occu_rate = occu_rate
@@ -453,6 +1744,596 @@ class Scene(object):
             im.save(name)
 
 
+def lower_bound(rects):
+    """Lower bound of the bounding area of any plan of `rects`: their total
+    area, and for each side, the least area of boxes at least as long as
+    the longest item along it, with the other side at least the sum of
+    items too long along it to sit side by side.
+
+    """
+    if not rects:
+        return 0
+    area = sum(r.area for r in rects)
+    dims = [r.least() for r in rects]
+    return max(_lower_bound_by_width(dims, area),
+               _lower_bound_by_width([(h, b) for b, h in dims], area))
+
+
+def _lower_bound_by_width(dims, area):
+    # Items wider than half of width `w` stack, which only changes where
+    # `w` passes twice an item width. Between, the area is least at the
+    # left end.
+    dims = sorted(dims)
+    w_min = dims[-1][0]
+    h_max = max(h for _, h in dims)
+    stack = sum(h for _, h in dims)
+    i = 0
+    best = None
+    for w in sorted({w_min} | {2 * b for b, _ in dims if 2 * b > w_min}):
+        while i < len(dims) and 2 * dims[i][0] <= w:
+            stack -= dims[i][1]
+            i += 1
+        a = max(w * max(h_max, stack), area)
+        if best is None or a < best:
+            best = a
+    return best
+
+
+# Sort keys of `Scene.prepare` for trying several orders of rectangles.
+# Each one takes a seed, which only random perturbations make use of.
+ORDERS = {
+    'area': lambda seed: None,
+    'max_side': lambda seed: lambda r: (max(r.b, r.h), r.area),
+    'perimeter': lambda seed: lambda r: (r.b + r.h, r.area),
+    'height_width': lambda seed: lambda r: (r.h, r.b),
+    'random': lambda seed: _perturbed_area(seed),
+}
+
+
+def _perturbed_area(seed):
+    import random
+    rnd = random.Random(seed)
+    noise = {}
+    def key(r):
+        # Drawn per rectangle in the order of first query, which is the
+        # order of the input list as `sorted` queries keys.
+        if id(r) not in noise:
+            noise[id(r)] = rnd.uniform(0.9, 1.1)
+        return r.area * noise[id(r)]
+    return key
+
+
+def default_orders(n_random=4):
+    return ([('area', 0), ('max_side', 0), ('perimeter', 0),
+             ('height_width', 0)] +
+            [('random', seed) for seed in range(n_random)])
+
+
+def plan_order(rects, x_max, y_max, order, scorer='default', **plan_kw):
+    "Plan `rects` in a new scene after sorting them by `order`."
+    name, seed = order
+    key = ORDERS[name](seed)
+    s = Scene(x_max, y_max, scorer=scorer)
+    s.prepare(rects, **({'key': key} if key else {}))
+    s.plan(**plan_kw)
+    return s
+
+
+def _plan_order_task(tps, x_max, y_max, order, scorer, plan_kw):
+    rects = [Rectangle(*tp) for tp in tps]
+    with plan_order(rects, x_max, y_max, order, scorer, **plan_kw) as s:
+        return s.occu_rate, [(r.xy, r.rotated) for r in rects]
+
+
+def plan_best(rects, x_max, y_max, orders=None, scorers=('default',),
+              workers=None, gap=None, **plan_kw):
+    """Plan `rects` in each of `orders` (`default_orders()` if None) with
+    each of `scorers` (registered names) on `workers` processes, and
+    return the scene of best occupancy. Ties go to the earlier run, so
+    the result does not depend on `workers`.
+
+    Workers report occupancy and positions; the winning plan is rebuilt
+    here by `Scene.replay` of its positions, rather than searched again.
+
+    With `gap`, runs stop after the first one within such a gap to the
+    `lower_bound`, and `rates` are of the runs up to it.
+
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    orders = default_orders() if orders is None else list(orders)
+    runs = [(o, sc) for o in orders for sc in scorers]
+    tps = [(r.b, r.h, r.rotatable) for r in rects]
+    if gap is not None:
+        # The bounding area of a run is `area / rate`.
+        close = (1 - gap) * sum(r.area for r in rects) / lower_bound(rects)
+    rates = []
+    best = None             # `(run, positions)`
+
+    def done(rate, pos):
+        nonlocal best
+        if not rates or rate > max(rates):
+            best = (len(rates), pos)
+        rates.append(rate)
+        return gap is not None and rate >= close
+
+    if workers == 1:
+        for o, sc in runs:
+            if done(*_plan_order_task(tps, x_max, y_max, o, sc, plan_kw)):
+                break
+    else:
+        ex = ProcessPoolExecutor(workers)
+        try:
+            futs = [ex.submit(_plan_order_task, tps, x_max, y_max, o, sc, plan_kw)
+                    for o, sc in runs]
+            for f in futs:
+                if done(*f.result()):
+                    break
+        finally:
+            ex.shutdown(cancel_futures=True)
+
+    i, pos = best
+    (name, seed), scorer = runs[i]
+    key = ORDERS[name](seed)
+    s = Scene(x_max, y_max, scorer=scorer)
+    s.prepare(rects, **({'key': key} if key else {}))
+    for r, (xy, rotated) in zip(rects, pos):
+        if r.rotated != rotated:
+            r.rotate()
+        r.xy = xy
+    if s.replay(rects):
+        # Not all of the plan replays, e.g. with grid blocks.
+        s.close()
+        s = plan_order(rects, x_max, y_max, *runs[i], **plan_kw)
+    else:
+        s.occu_rate = sum(r.area for r in rects) / (s.x_bnd * s.y_bnd)
+    s.order, s.scorer_name = runs[i]
+    s.rates = rates
+    return s
+
+
+def plan_portfolio(rects, x_max, y_max, scorers=None, workers=None, gap=None,
+                   **plan_kw):
+    """Race the registered scorers (all if `scorers` is None) on the
+    default order, see `plan_best`. The best tie-breakers depend on the
+    distribution of rectangle sizes.
+
+    """
+    scorers = list(SCORERS) if scorers is None else scorers
+    return plan_best(rects, x_max, y_max, [('area', 0)], scorers,
+                     workers, gap, **plan_kw)
+
+
+def _probe_task(tps, side, scorer):
+    s = Scene(side, side, scorer=scorer)
+    s.prepare([Rectangle(*tp) for tp in tps])
+    with s:
+        return s.probe()
+
+
+def plan_bisect(rects, scorer='default', workers=None):
+    """Plan `rects` in about the least square container in which the
+    greedy plan fits, found by bisecting its side with parallel probes
+    (`Scene.probe`) on `workers` processes.
+
+    The side starts between the square root of the total area and the
+    longer side of the unbounded plan, which fits as the plan stays the
+    same. Each round probes evenly spaced sides in between. Since fitting
+    is not monotone in the side, the least side found to fit is kept.
+
+    """
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    from math import isqrt
+
+    tps = [(r.b, r.h, r.rotatable) for r in rects]
+    area = sum(r.area for r in rects)
+    big = sum(max(r.b, r.h) for r in rects)
+    with plan_order([Rectangle(*tp) for tp in tps], big, big,
+                    ('area', 0), scorer) as s:
+        hi = max(s.x_bnd, s.y_bnd)
+    # the greatest side known not to fit
+    lo = max(isqrt(area - 1), max(max(r.b, r.h) for r in rects) - 1)
+    k = workers or os.cpu_count() or 1
+
+    ex = ProcessPoolExecutor(workers) if k > 1 else None
+    try:
+        while hi - lo > 1:
+            sides = sorted({lo + (hi - lo) * (i + 1) // (k + 1) for i in range(k)} - {lo, hi})
+            if ex:
+                oks = list(ex.map(_probe_task, [tps] * len(sides), sides,
+                                  [scorer] * len(sides)))
+            else:
+                oks = [_probe_task(tps, side, scorer) for side in sides]
+            hi = min([w for w, ok in zip(sides, oks) if ok], default=hi)
+            lo = max([w for w, ok in zip(sides, oks) if not ok and w < hi], default=lo)
+    finally:
+        if ex:
+            ex.shutdown()
+
+    s = Scene(hi, hi, scorer=scorer)
+    s.prepare(rects)
+    if not s.probe():
+        # the unbounded plan
+        s = plan_order(rects, hi, hi, ('area', 0), scorer)
+    return s
+
+
+def solve(rects, x_max, y_max, time_limit=None, gap=None, **plan_kw):
+    """Plan `rects` greedily, then keep improving the plan until
+    `time_limit` seconds have passed, by restarts over `default_orders`
+    and the registered scorers, and then by `Scene.improve` of the best
+    order so far. Positions of `rects` follow the best plan found.
+
+    The returned scene has `history` of `(seconds, occu_rate)` for each
+    improvement, the greedy plan coming first. With `gap`, improving stops
+    once within such a gap to the `lower_bound`.
+
+    """
+    t0 = time.time()
+    if time_limit is None:
+        s = plan_order(rects, x_max, y_max, ('area', 0), **plan_kw)
+        s.history = [(time.time() - t0, s.occu_rate)]
+        return s
+
+    deadline = t0 + time_limit
+    best = None     # `(occu_rate, scene, copies of rects planned in it)`
+    history = []
+    close = 2       # occupancy within `gap`, if any
+    if gap is not None and rects:
+        close = (1 - gap) * sum(r.area for r in rects) / lower_bound(rects)
+
+    def attempt(scene, rs):
+        nonlocal best
+        rate = getattr(scene, 'occu_rate', None)
+        if rate is not None and (best is None or rate > best[0]):
+            if best:
+                best[1].close()
+            best = (rate, scene, rs)
+            history.append((time.time() - t0, rate))
+        else:
+            scene.close()
+
+    def copies():
+        return [Rectangle(r.b, r.h, r.rotatable) for r in rects]
+
+    # A run is not started unless the longest one so far would end in
+    # time. Improving starts with a whole plan as well.
+    longest = 0
+    runs = [(o, sc) for o in default_orders() for sc in SCORERS]
+    for order, scorer in runs:
+        t = time.time()
+        if best and (t + longest > deadline or best[0] >= close):
+            break
+        rs = copies()
+        attempt(plan_order(rs, x_max, y_max, order, scorer, **plan_kw), rs)
+        longest = max(longest, time.time() - t)
+
+    seed = 0
+    while len(rects) > 1 and best[0] < close:
+        t = time.time()
+        if t + longest > deadline:
+            break
+        rs = copies()
+        idx = {id(r): i for i, r in enumerate(best[2])}
+        s = Scene(x_max, y_max, scorer=best[1].scorer)
+        s.rects = [rs[idx[id(r)]] for r in best[1].rects]
+        s.improve(100, seed=seed, deadline=deadline)
+        attempt(s, rs)
+        seed += 1
+
+    # Positions of the best plan go to `rects`.
+    _, s, rs = best
+    for r, c in zip(rects, rs):
+        if r.rotated != c.rotated:
+            r.rotate()
+        r.xy = c.xy
+    idx = {id(c): i for i, c in enumerate(rs)}
+    s.rects = [rects[idx[id(c)]] for c in s.rects]
+    s.history = history
+    return s
+
+
+def warm_start(rects, placements, x_max, y_max, **scene_kw):
+    """Plan `rects` starting from `placements` of a former plan, i.e. the
+    `[(x1, y1), (x2, y2), ...]` items of an output file of `solve_file`.
+
+    Rectangles of the size of a former one keep its position, being
+    replayed by `Scene.replay`, and the others are planted by `Scene.add`,
+    the greater first. Former ones left unmatched are replayed as well,
+    and their regions become `holes` reused by the added ones. The cost
+    is about one plant per kept rectangle, plus a search per added one.
+
+    The returned scene has `kept`, `added` and `removed` rectangles.
+    Placements at the position of an earlier one are ignored, and items of
+    other schemas, e.g. of `solve_file_bins`, are refused.
+
+    """
+    former = {}
+    seen = set()
+    for p in placements:
+        if not (len(p) == 2 or len(p) == 3 and type(p[2]) is bool):
+            raise Exception('Not a placement of a single plan: {}'.format(p))
+        (x1, y1), (x2, y2) = p[:2]
+        if x2 <= x1 or y2 <= y1:
+            raise Exception('Not a placement of a single plan: {}'.format(p))
+        if (x1, y1) not in seen:
+            seen.add((x1, y1))
+            former.setdefault((x2 - x1, y2 - y1), []).append((x1, y1))
+    for xys in former.values():
+        xys.reverse()
+
+    kept, added = [], []
+    for r in rects:
+        for b, h in ((r.b, r.h), (r.h, r.b)) if r.rotatable else ((r.b, r.h),):
+            if former.get((b, h)):
+                if (b, h) != (r.b, r.h):
+                    r.rotate()
+                r.xy = former[(b, h)].pop()
+                kept.append(r)
+                break
+        else:
+            added.append(r)
+    removed = []
+    for (b, h), xys in former.items():
+        for xy in xys:
+            r = Rectangle(b, h)
+            r.xy = xy
+            removed.append(r)
+
+    s = Scene(x_max, y_max, **scene_kw)
+    left = s.replay(kept + removed)
+    s.holes = [Hole(s, r.xy[0], r.xy[1], r.b, r.h) for r in removed if r.xy]
+    left = set(left)
+    s.kept = [r for r in kept if r not in left]
+    s.added = added + [r for r in kept if r in left]
+    s.removed = removed
+    s.rects = list(s.kept)
+    for r in sorted(s.added, reverse=True):
+        s.add(r)
+    if not s.added and s.rects:
+        s.occu_rate = sum(r.area for r in s.rects) / (s.x_bnd * s.y_bnd)
+    return s
+
+
+def _plan_group_task(tps, scorers, plan_kw):
+    """Plan a group unbounded with each of `scorers`, then in about the
+    least square container with the best one: from the one of 95%
+    occupancy, growing by 3% while smaller than the unbounded plan.
+
+    """
+    def planned(side, scorer, probe):
+        rects = [Rectangle(*tp) for tp in tps]
+        with Scene(side, side, scorer=scorer) as s:
+            s.prepare(rects)
+            if probe:
+                if not s.probe():
+                    return None
+            else:
+                s.plan(**plan_kw)
+            return [(r.xy, r.rotated) for r in rects], s.x_bnd, s.y_bnd
+
+    area = sum(tp[0] * tp[1] for tp in tps)
+    big = sum(max(tp[:2]) for tp in tps)
+    best = scorer = None
+    for sc in scorers:
+        res = planned(big, sc, False)
+        if best is None or res[1] * res[2] < best[1] * best[2]:
+            best, scorer = res, sc
+    side = max(int((area / 0.95) ** 0.5), max(max(tp[:2]) for tp in tps))
+    while side < max(best[1:]):
+        res = planned(side, scorer, True)
+        if res:
+            return res
+        side = int(side * 1.03) + 1
+    return best
+
+
+def plan_groups(rects, x_max, y_max, group_size=1000, by='size',
+                scorers=('default', 'fill'), workers=None, **plan_kw):
+    """Plan a large number of `rects` by parts: partition them into groups
+    of about `group_size`, plan the groups in their own scenes on
+    `workers` processes, then plan the bounding boxes of the groups as
+    rectangles of the returned top-level scene. Positions of `rects` are
+    set in the top-level scene, whose `rects` are all of them.
+
+    Groups are as many as make a grid of columns and rows, of about the
+    same area, and are each planned in about the least square container,
+    so that they are planted as a grid block of squares of the same side.
+
+    With `by='size'`, `rects` by descending area are dealt to the groups
+    back and forth, so each holds at most `group_size` of all sizes. With
+    `by='chunk'`, groups are consecutive in the given order, cut at equal
+    shares of the area, so they hold about `group_size` only if sizes
+    are mixed alike along the input. The cost is about `N * group_size`
+    plants rather than `N ** 2`, for groups of about `group_size`.
+
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    if by == 'size':
+        rs = sorted(rects, reverse=True)
+    else:
+        assert by == 'chunk', by
+        rs = list(rects)
+    k = -(-len(rs) // group_size)
+    cols = -(-k // max(1, int(k ** 0.5)))
+    rows = -(-k // cols)
+    k = cols * rows
+
+    area = sum(r.area for r in rs)
+    if by == 'size':
+        # Deal `rs` to groups back and forth, which gives each at most
+        # `group_size` and about the same area.
+        groups = [rs[i::2 * k] + rs[2 * k - 1 - i::2 * k] for i in range(k)]
+    else:
+        # Cut `rs` where the running area passes multiples of its share.
+        groups = [[]]
+        acc = 0
+        for r in rs:
+            if acc >= area * len(groups) / k and len(groups) < k:
+                groups.append([])
+            groups[-1].append(r)
+            acc += r.area
+    groups = [g for g in groups if g]
+
+    tasks = [[(r.b, r.h, r.rotatable) for r in g] for g in groups]
+    if workers == 1:
+        results = [_plan_group_task(tps, scorers, plan_kw) for tps in tasks]
+    else:
+        with ProcessPoolExecutor(workers) as ex:
+            results = list(ex.map(_plan_group_task, tasks, [scorers] * len(tasks),
+                                  [plan_kw] * len(tasks)))
+
+    # Groups as squares of the same side are planted as a grid block.
+    side = max(max(x_bnd, y_bnd) for _, x_bnd, y_bnd in results)
+    supers = [Rectangle(side, side) for _ in results]
+    s = Scene(x_max, y_max)
+    s.prepare(supers)
+    s.plan(batch=True)
+    for g, sup, (pos, _, _) in zip(groups, supers, results):
+        x0, y0 = sup.xy
+        for r, ((x, y), rotated) in zip(g, pos):
+            if r.rotated != rotated:
+                r.rotate()
+            r.xy = (x0 + x, y0 + y)
+    s.groups = supers
+    s.rects = list(rects)
+    s.occu_rate = area / (s.x_bnd * s.y_bnd)
+    return s
+
+
+class ReorderBuffer(object):
+    """Hold up to `size` rectangles arriving for `scene.add`, adding the
+    greatest one held whenever more arrive, since planting greater ones
+    first yields denser plans. Latencies count from arrival. Rectangles
+    `scene.add` refuses, e.g. finding no room in a bounded scene, are
+    kept in `refused` rather than returned as added.
+
+    """
+
+    def __init__(self, scene, size=8):
+        self.scene = scene
+        self.size = size
+        self.held = []          # heap of `(-area, arrival #, seconds, rect)`
+        self.count = 0
+        self.refused = []
+
+    def __len__(self):
+        return len(self.held)
+
+    def _pop(self):
+        _, _, t, rect = heappop(self.held)
+        if self.scene.add(rect, since=t):
+            return [rect]
+        self.refused.append(rect)
+        return []
+
+    def push(self, rect):
+        "Hold `rect`, returning rectangles added meanwhile."
+        heappush(self.held, (-rect.area, self.count, time.perf_counter(), rect))
+        self.count += 1
+        out = []
+        while len(self.held) > self.size:
+            out += self._pop()
+        return out
+
+    def flush(self):
+        "Add all rectangles held, returning those added."
+        out = []
+        while self.held:
+            out += self._pop()
+        return out
+
+
+class BinPacker(object):
+    """Pack rectangles into bins, i.e. bounded scenes of the same size,
+    opening a new bin only when no open one holds a rectangle.
+
+    Bins are indexed by free area, and each tells the greatest slot
+    width and height among its corners (upper bounds, see `SlotIndex`),
+    so that a rectangle is only tried in bins that may hold it. Of
+    those, the one with the least free area is tried first.
+
+    """
+
+    def __init__(self, x_max, y_max, **scene_kw):
+        self.x_max = x_max
+        self.y_max = y_max
+        self.scene_kw = scene_kw
+        self.bins = []          # scenes
+        self.placed = []        # planted area per bin
+        self.frees = []         # sorted `(free area, bin id)`
+        self.bin_of = {}        # rectangle -> bin id
+
+    def __len__(self):
+        return len(self.bins)
+
+    def _open(self):
+        s = Scene(self.x_max, self.y_max, **self.scene_kw)
+        s.rects = []
+        self.bins.append(s)
+        self.placed.append(0)
+        self.frees.insert(bisect_left(self.frees, (self.x_max * self.y_max, len(self.bins) - 1)),
+                          (self.x_max * self.y_max, len(self.bins) - 1))
+        return len(self.bins) - 1
+
+    def _may_hold(self, i, rect):
+        idx = self.bins[i].index
+        if not len(idx):
+            return False
+        dx, dy = max(idx.bdx), max(idx.bdy)
+        return ((dx >= rect.b and dy >= rect.h) or
+                (rect.rotatable and dx >= rect.h and dy >= rect.b))
+
+    def _try(self, i, rect):
+        s = self.bins[i]
+        n = s.walk_find_best(rect)
+        if n is None or not n.can_plant(rect, self.x_max, self.y_max):
+            return False
+        free = self.x_max * self.y_max - self.placed[i]
+        del self.frees[bisect_left(self.frees, (free, i))]
+        n.plant(rect)
+        s.rects.append(rect)
+        self.placed[i] += rect.area
+        free -= rect.area
+        self.frees.insert(bisect_left(self.frees, (free, i)), (free, i))
+        self.bin_of[rect] = i
+        return True
+
+    def add(self, rect):
+        "Plant `rect` in some bin, returning its id."
+        j = bisect_left(self.frees, (rect.area, -1))
+        for free, i in self.frees[j:]:
+            if self._may_hold(i, rect) and self._try(i, rect):
+                return i
+        if ((rect.b > self.x_max or rect.h > self.y_max) and
+            not (rect.rotatable and rect.h <= self.x_max and rect.b <= self.y_max)):
+            raise Exception('Rectangle larger than the bins: {}'.format(rect))
+        i = self._open()
+        if not self._try(i, rect):
+            raise Exception('No room for {} in an empty bin'.format(rect))
+        return i
+
+    def pack(self, rects):
+        """Plant `rects`, the greater first, returning the bin id of each
+        of them in the given order.
+
+        """
+        least = Rectangle.least_of(rects) if rects else (1, 1)
+        for r in sorted(rects, reverse=True):
+            if r not in self.bin_of:
+                n = len(self.bins)
+                i = self.add(r)
+                if i == n:
+                    self.bins[i].expect(*least)
+        return [self.bin_of[r] for r in rects]
+
+    def occu_rates(self):
+        "Occupancy of each bin."
+        return [a / (self.x_max * self.y_max) for a in self.placed]
+
+
 def show(scene):
 
     import matplotlib.pyplot as plt
@@ -498,17 +2379,35 @@ class Gen(object):
             return eval(o.read())
 
 
-def solve_file(inpfile, outfile, nofigure=True):
+def solve_file(inpfile, outfile, nofigure=True, time_limit=None, bisect=False,
+               rotate=False, bins=None, gap=None, warm=None):
     
     tps = Gen.from_file(inpfile)
     N = len(tps)
-    scn_max = int(max(max(*tp) for tp in tps) * N * 1.01)
-    s = Scene(scn_max, scn_max)
+    scn_max = int(max(max(tp[:2]) for tp in tps) * N * 1.01)
+    # A third item of a tuple tells whether the rectangle is rotatable.
     rects = [Rectangle(*tp) for tp in tps]
-    s.prepare(rects)
-    oc_rt = s.plan()
+    if rotate:
+        for r in rects:
+            r.rotatable = True
+    if bins:
+        return solve_file_bins(inpfile, outfile, rects, *bins)
+    if warm:
+        # Positions of the former plan are within the scene anyway.
+        placements = Gen.from_file(warm)
+        scn_max = max([scn_max] + [max(p[1]) for p in placements])
+        s = warm_start(rects, placements, scn_max, scn_max)
+    elif bisect:
+        s = plan_bisect(rects)
+    else:
+        s = solve(rects, scn_max, scn_max, time_limit, gap)
+    oc_rt = s.occu_rate
     
-    res = [[r.xy, r.xy2] for r in rects]
+    rotatable = any(r.rotatable for r in rects)
+    if rotatable:
+        res = [[r.xy, r.xy2, r.rotated] for r in rects]
+    else:
+        res = [[r.xy, r.xy2] for r in rects]
     xb, yb = s.xy_bounding()
 
     if outfile == '':
@@ -519,11 +2418,48 @@ def solve_file(inpfile, outfile, nofigure=True):
         o.write('# Bounding: {}x{}\n'.format(xb, yb))
         o.write('# Aspect ratio of bounding: {}/{} == {:.4f}\n'.format(xb, yb, xb/yb))
         o.write('# Occupacy rate: {}\n'.format(oc_rt))
-        o.write('# Schema: [(x1, y1), (x2, y2)]\n')
+        o.write('# Gap to lower bound: {:.4f}\n'.format(s.gap))
+        if warm:
+            o.write('# Warm start from "{}": kept {}, added {}, removed {}\n'.format(
+                warm, len(s.kept), len(s.added), len(s.removed)))
+        elif bisect:
+            o.write('# Container: {}x{}\n'.format(s.x_max, s.y_max))
+        elif time_limit is not None:
+            o.write('# Occupacy rate over seconds: {}\n'.format(s.history))
+        if rotatable:
+            o.write('# Schema: [(x1, y1), (x2, y2), rotated]\n')
+        else:
+            o.write('# Schema: [(x1, y1), (x2, y2)]\n')
         o.write(pformat(res))
 
     if not nofigure:
         s.figure(outfile + '_figure.png')
+
+
+def solve_file_bins(inpfile, outfile, rects, x_max, y_max):
+
+    bp = BinPacker(x_max, y_max)
+    ids = bp.pack(rects)
+    rates = bp.occu_rates()
+
+    rotatable = any(r.rotatable for r in rects)
+    if rotatable:
+        res = [[r.xy, r.xy2, i, r.rotated] for r, i in zip(rects, ids)]
+    else:
+        res = [[r.xy, r.xy2, i] for r, i in zip(rects, ids)]
+
+    if outfile == '':
+        outfile = 'output_for__{}___{}_bins_{}x{}'.format(inpfile, len(bp), x_max, y_max)
+
+    with open(outfile, 'w') as o:
+        o.write('# Output file for input file "{}"\n'.format(inpfile))
+        o.write('# Bins: {} of {}x{}\n'.format(len(bp), x_max, y_max))
+        o.write('# Occupacy rate per bin: {}\n'.format(rates))
+        if rotatable:
+            o.write('# Schema: [(x1, y1), (x2, y2), bin, rotated]\n')
+        else:
+            o.write('# Schema: [(x1, y1), (x2, y2), bin]\n')
+        o.write(pformat(res))
         
 
 if __name__ == '__main__':
@@ -547,6 +2483,38 @@ if __name__ == '__main__':
         '-n', '--nofigure',
         help=('No figure output.'),
         default=False)
+    p.add_argument(
+        '--time-limit',
+        help=('Seconds to keep improving the greedy solution. '
+              'Default: greedy solution only'),
+        type=float,
+        default=None)
+    p.add_argument(
+        '--gap',
+        help=('Stop improving once within such a relative gap '
+              'to the lower bound of the bounding area.'),
+        type=float,
+        default=None)
+    p.add_argument(
+        '-b', '--bisect',
+        help=('Bisect for the least square container, '
+              'rather than an unbounded one.'),
+        action='store_true')
+    p.add_argument(
+        '-r', '--rotate',
+        help=('Allow rotating any rectangle by 90 degrees.'),
+        action='store_true')
+    p.add_argument(
+        '--warm',
+        help=('Output file of a former solution to start from, '
+              'placing only the rectangles added since.'),
+        default=None)
+    p.add_argument(
+        '--bins',
+        help=('Pack into as few bins of size WxH as possible, '
+              'e.g. "1000x800".'),
+        type=lambda v: tuple(int(d) for d in v.split('x')),
+        default=None)
 
     args = p.parse_args()
 
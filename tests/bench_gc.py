@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Benchmark the time spent by the cyclic garbage collector while planning.
+
+    python bench_gc.py [N]
+
+plans N (default 100000) random rectangles, first with the collector on,
+then with `Scene.plan(pause_gc=True)`, and reports the time spent in
+collections during planning and while disposing of the scene.
+
+"""
+
+import preamble
+import gc
+import random
+import sys
+import time
+from repacker import *
+
+
+class GCTimer(object):
+
+    def __init__(self):
+        self.total = 0
+        self.count = 0
+
+    def __call__(self, phase, info):
+        if phase == 'start':
+            self.t0 = time.perf_counter()
+        else:
+            self.total += time.perf_counter() - self.t0
+            self.count += 1
+
+
+def run(tps, pause_gc):
+    gc.collect()
+    timer = GCTimer()
+    gc.callbacks.append(timer)
+    try:
+        s = Scene(10 ** 9, 10 ** 9)
+        s.prepare([Rectangle(*tp) for tp in tps])
+        timer.total = timer.count = 0
+        t0 = time.perf_counter()
+        rate = s.plan(pause_gc=pause_gc)
+        t1 = time.perf_counter()
+        plan_gc = timer.total, timer.count
+        if pause_gc:
+            s.close()
+        del s
+        gc.collect()
+        t2 = time.perf_counter()
+    finally:
+        gc.callbacks.remove(timer)
+    print('pause_gc={!s:5}  rate {:.4f}  plan {:8.2f}s  '
+          'GC during plan {:7.2f}s ({} runs)  disposal {:6.2f}s'.format(
+              pause_gc, rate, t1 - t0, plan_gc[0], plan_gc[1], t2 - t1))
+
+
+if __name__ == '__main__':
+
+    N = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    random.seed(0)
+    tps = [(random.randint(10, 50), random.randint(10, 50))
+           for _ in range(N)]
+
+    run(tps, False)
+    run(tps, True)
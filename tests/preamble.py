@@ -8,3 +8,22 @@ sys.path.append(
         )
     )
 )
+
+
+def nonoverlap(rs, holes=()):
+    "Assert that no two of planted `rs` and `holes` overlap."
+    regions = ([r.xy + (r.b, r.h) for r in rs] +
+               [(h.x, h.y, h.b, h.h) for h in holes])
+    for i, (ax, ay, ab, ah) in enumerate(regions):
+        for bx, by, bb, bh in regions[:i]:
+            assert (ax + ab <= bx or bx + bb <= ax or
+                    ay + ah <= by or by + bh <= ay), (regions[i], (bx, by))
+
+
+def planned(tps, **kw):
+    "Scene planning rectangles of sizes `tps` with `plan(**kw)`."
+    from repacker import Rectangle, Scene
+    s = Scene(100000, 100000)
+    s.prepare([Rectangle(*tp) for tp in tps])
+    s.plan(**kw)
+    return s
@@ -0,0 +1,64 @@
+import preamble
+import random
+from preamble import nonoverlap
+from repacker import *
+
+random.seed(22)
+tps = [(random.randint(1, 60), random.randint(1, 60))
+       for _ in range(200)]
+
+rs1 = [Rectangle(*tp) for tp in tps]
+s1 = Scene(100000, 100000)
+s1.prepare(rs1)
+s1.plan()
+
+# Adding one by one in the same order yields the same plan.
+rs2 = [Rectangle(*tp) for tp in tps]
+s2 = Scene(100000, 100000)
+assert s2.latency() == {50: None, 90: None, 99: None}
+for r in sorted(rs2, reverse=True):
+    assert s2.add(r)
+assert [r.xy for r in rs1] == [r.xy for r in rs2]
+assert s2.occu_rate == s1.occu_rate
+assert len(s2.latencies) == len(tps)
+ls = s2.latency()
+assert sorted(ls) == [50, 90, 99]
+assert 0 <= ls[50] <= ls[90] <= ls[99] <= max(s2.latencies)
+assert s2.latency(100) == {100: max(s2.latencies)}
+
+# A buffer as large as the stream sorts it all.
+rs3 = [Rectangle(*tp) for tp in tps]
+s3 = Scene(100000, 100000)
+buf = ReorderBuffer(s3, size=len(tps))
+assert all(buf.push(r) == [] for r in rs3)
+assert len(buf.flush()) == len(tps) and not len(buf)
+assert [r.xy for r in rs3] == [r.xy for r in rs1]
+
+# A small one adds as rectangles arrive.
+rs4 = [Rectangle(*tp) for tp in tps]
+s4 = Scene(100000, 100000)
+buf = ReorderBuffer(s4, size=4)
+added = []
+for r in rs4:
+    added += buf.push(r)
+    assert len(buf) == min(4, rs4.index(r) + 1)
+added += buf.flush()
+assert sorted(map(id, added)) == sorted(map(id, rs4))
+assert all(r.xy for r in rs4)
+nonoverlap(rs4)
+
+# No room left in a bounded scene.
+s5 = Scene(10, 10)
+assert s5.add(Rectangle(10, 6))
+assert not s5.add(Rectangle(5, 5))
+assert s5.add(Rectangle(5, 4))
+assert s5.rects[-1].xy == (0, 6) and s5.occu_rate == 80 / 100
+
+# A buffer over a bounded scene returns only the rectangles added.
+s6 = Scene(10, 10)
+buf = ReorderBuffer(s6, size=1)
+r1, r2 = Rectangle(10, 6), Rectangle(5, 5)
+assert buf.push(r1) == []
+assert buf.push(r2) == [r1]
+assert buf.flush() == [] and buf.refused == [r2]
+assert r2.xy is None and s6.rects == [r1]
@@ -0,0 +1,34 @@
+import preamble
+import random
+from repacker import *
+
+random.seed(9)
+
+rs = [Rectangle(random.randint(1, 100),
+                random.randint(1, 100))
+      for _ in range(300)]
+rs += [Rectangle(33, 33) for _ in range(300)]
+rs += [Rectangle(66, 66) for _ in range(100)]
+
+s = Scene(100000, 100000)
+s.prepare(rs)
+rate = s.plan(batch=True)
+
+# All planted, without overlapping and within the bounding.
+assert all(r.xy for r in rs)
+x_bnd, y_bnd = s.xy_bounding()
+assert max(r.xy2[0] for r in rs) == x_bnd
+assert max(r.xy2[1] for r in rs) == y_bnd
+for i, a in enumerate(rs):
+    for b in rs[i + 1:]:
+        assert (a.xy2[0] <= b.xy[0] or b.xy2[0] <= a.xy[0] or
+                a.xy2[1] <= b.xy[1] or b.xy2[1] <= a.xy[1]), (a, b)
+assert rate == sum(r.area for r in rs) / (x_bnd * y_bnd)
+
+# A run is planted as a grid of neighbouring rectangles.
+s = Scene(1000, 1000)
+rs = [Rectangle(5, 5) for _ in range(30)]
+s.prepare(rs)
+assert s.plan(batch=True) == 1.0
+assert sorted(r.xy for r in rs) == sorted(
+    (5 * i, 5 * j) for i in range(5) for j in range(6))
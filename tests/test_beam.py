@@ -0,0 +1,41 @@
+import preamble
+import random
+from preamble import nonoverlap, planned
+from repacker import *
+
+random.seed(15)
+tps = [(random.randint(1, 60), random.randint(1, 60))
+       for _ in range(80)]
+
+
+# A beam of width 1 is the greedy plan.
+s0 = planned(tps)
+s1 = planned(tps, beam=1)
+assert [r.xy for r in s1.rects] == [r.xy for r in s0.rects]
+
+# Candidates come best first, the best one being the greedy choice.
+s = Scene(100000, 100000)
+s.prepare([Rectangle(*tp) for tp in tps])
+for r in s.rects[:40]:
+    s.walk_find_best(r).plant(r)
+r = s.rects[40]
+cs = s.candidates(r, 5)
+assert len(cs) == 5
+assert [k for k, n in cs] == sorted(k for k, n in cs)
+assert cs[0][1] is s.walk_find_best(r)
+
+s3 = planned(tps, beam=3)
+nonoverlap(s3.rects)
+assert s3.journal is None
+assert s3.occu_rate == sum(r.area for r in s3.rects) / (s3.x_bnd * s3.y_bnd)
+
+# Beams never do worse than the greedy plan.
+for seed in range(5):
+    random.seed(seed)
+    tps = [(random.randint(1, 60), random.randint(1, 60))
+           for _ in range(150)]
+    s0 = planned(tps)
+    for k in (2, 3):
+        s = planned(tps, beam=k)
+        assert s.occu_rate >= s0.occu_rate, (seed, k)
+        nonoverlap(s.rects)
@@ -0,0 +1,43 @@
+import preamble
+import random
+from preamble import nonoverlap
+from repacker import *
+
+random.seed(19)
+tps = [(random.randint(10, 100), random.randint(10, 100))
+       for _ in range(300)]
+
+
+rs = [Rectangle(*tp) for tp in tps]
+bp = BinPacker(300, 200)
+ids = bp.pack(rs)
+assert len(ids) == len(rs)
+assert sorted(set(ids)) == list(range(len(bp)))
+
+# Each bin holds its rectangles within bounds, without overlap.
+for i, s in enumerate(bp.bins):
+    mine = [r for r, j in zip(rs, ids) if j == i]
+    assert mine and sorted(map(id, mine)) == sorted(map(id, s.rects))
+    assert all(r.xy[0] + r.b <= 300 and r.xy[1] + r.h <= 200 for r in mine)
+    nonoverlap(mine)
+
+rates = bp.occu_rates()
+assert all(0 < rate <= 1 for rate in rates)
+assert abs(sum(rates) * 300 * 200 - sum(r.area for r in rs)) < 1e-6
+# No more bins than needed by far.
+assert len(bp) <= 2 * sum(r.area for r in rs) / (300 * 200) + 1
+
+# The free-area index follows the bins.
+assert sorted(bp.frees) == bp.frees
+assert [f for f, i in sorted(bp.frees, key=lambda e: e[1])] == \
+    [300 * 200 - a for a in bp.placed]
+
+# Rotation lets long rectangles in.
+bp = BinPacker(50, 200)
+r = Rectangle(150, 40, rotatable=True)
+assert bp.add(r) == 0 and r.rotated
+try:
+    bp.add(Rectangle(150, 40))
+    assert 0
+except Exception as e:
+    assert 'larger' in str(e)
@@ -0,0 +1,35 @@
+import preamble
+import random
+from preamble import nonoverlap
+from repacker import *
+
+random.seed(17)
+tps = [(random.randint(10, 100), random.randint(10, 100))
+       for _ in range(120)]
+
+
+# Plants flush against the bounds terminate, with a valid chain.
+for side in (700, 650, 600):
+    s = Scene(side, side)
+    s.prepare([Rectangle(*tp) for tp in tps])
+    fit = s.probe()
+    s.validate_linking()
+    rs = [r for r in s.rects if r.xy]
+    nonoverlap(rs)
+    assert all(r.xy[0] + r.b <= side and r.xy[1] + r.h <= side for r in rs)
+    assert fit == (len(rs) == len(tps))
+
+# Too small a container is rejected before planting.
+s = Scene(100, 100)
+s.prepare([Rectangle(*tp) for tp in tps])
+assert not s.probe()
+assert not any(r.xy for r in s.rects)
+
+rs = [Rectangle(*tp) for tp in tps]
+s = plan_bisect(rs, workers=1)
+u = Scene(100000, 100000)
+u.prepare([Rectangle(*tp) for tp in tps])
+u.plan()
+assert s.x_max == s.y_max <= max(u.xy_bounding())
+assert all(r.xy[0] + r.b <= s.x_max and r.xy[1] + r.h <= s.y_max for r in rs)
+nonoverlap(rs)
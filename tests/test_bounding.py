@@ -0,0 +1,25 @@
+import preamble
+import random
+from repacker import *
+
+random.seed(1)
+
+s = Scene(100000, 100000)
+assert s.xy_bounding() == (0, 0)
+
+rs = [Rectangle(random.randint(1, 60),
+                random.randint(1, 60))
+      for _ in range(200)]
+s.prepare(rs)
+
+for r in s.rects:
+    n = s.walk_find_best(r)
+    n.plant(r)
+    # Compare against a full walk of the chain, ignoring `top`.
+    w = s.top.walk()
+    next(w)
+    ns = list(w)
+    assert s.x_bnd == max(n.x for n in ns)
+    assert s.y_bnd == max(n.y for n in ns)
+    assert s.x_bnd == max(r.xy2[0] for r in rs if r.xy)
+    assert s.y_bnd == max(r.xy2[1] for r in rs if r.xy)
@@ -0,0 +1,31 @@
+import preamble
+import random
+from repacker import *
+
+# Items too wide to sit side by side stack up.
+assert lower_bound([Rectangle(10, 1), Rectangle(1, 10)]) == 100
+assert lower_bound([Rectangle(10, 1), Rectangle(1, 10, True)]) == 20
+assert lower_bound([Rectangle(6, 2), Rectangle(5, 2), Rectangle(5, 2)]) == 32
+assert lower_bound([Rectangle(10, 10)] * 4) == 400
+assert lower_bound([]) == 0
+
+random.seed(21)
+for _ in range(20):
+    tps = [(random.randint(1, 60), random.randint(1, 60))
+           for _ in range(random.randint(1, 40))]
+    for order in default_orders(1):
+        s = plan_order([Rectangle(*tp) for tp in tps], 100000, 100000, order)
+        assert lower_bound(s.rects) <= s.x_bnd * s.y_bnd
+        assert 0 <= s.gap < 1
+
+# Races stop at the first run within the gap.
+tps = [(random.randint(1, 60), random.randint(1, 60)) for _ in range(100)]
+s = plan_best([Rectangle(*tp) for tp in tps], 100000, 100000, workers=1)
+assert len(s.rates) == len(default_orders())
+s = plan_best([Rectangle(*tp) for tp in tps], 100000, 100000, workers=1, gap=1)
+assert len(s.rates) == 1
+s = plan_portfolio([Rectangle(*tp) for tp in tps], 100000, 100000, workers=2, gap=1)
+assert len(s.rates) == 1 and s.gap <= 1
+
+s = solve([Rectangle(*tp) for tp in tps], 100000, 100000, time_limit=60, gap=1)
+assert len(s.history) == 1
@@ -0,0 +1,33 @@
+import preamble
+import gc
+import random
+import weakref
+from repacker import *
+
+random.seed(10)
+rs = [Rectangle(random.randint(1, 50), random.randint(1, 50))
+      for _ in range(100)]
+
+with Scene(10000, 10000) as s:
+    s.prepare(rs)
+    rate = s.plan(pause_gc=True)
+    assert gc.isenabled()
+    top = s.top
+
+# Pointers are cleared, while the plan survives.
+assert top.next is None and top.scene is None
+assert all(r.xy for r in rs)
+
+# Without cycles, the scene is freed right away by reference counting,
+# leaving nothing to the collector.
+gc.collect()
+gc.disable()
+try:
+    s = Scene(10000, 10000)
+    s.prepare([Rectangle(5, 5) for _ in range(20)])
+    s.plan()
+    s.close()
+    del s
+    assert gc.collect() == 0
+finally:
+    gc.enable()
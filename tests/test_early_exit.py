@@ -0,0 +1,34 @@
+import preamble
+import random
+from repacker import *
+
+random.seed(7)
+
+
+def exhaustive(s, rect):
+    "Best corner as by assessing every corner along the chain."
+    x_bnd, y_bnd = s.xy_bounding()
+
+    def assess(n):
+        x_bnd1 = max(n.x_put() + rect.b, x_bnd)
+        y_bnd1 = max(n.y_put() + rect.h, y_bnd)
+        return (x_bnd1 + y_bnd1, x_bnd1 * y_bnd1, n.x + n.y,
+                -n.slot_fill_rate(rect))
+
+    w = s.top.walk()
+    next(w)
+    return min((n for n in w if n.can_plant(rect, s.x_max, s.y_max)),
+               default=s.top.next, key=assess)
+
+
+s = Scene(100000, 100000)
+rs = [Rectangle(random.randint(1, 40),
+                random.randint(1, 40))
+      for _ in range(250)]
+rs += [Rectangle(12, 12) for _ in range(40)]
+s.prepare(rs)
+
+for r in s.rects:
+    n = s.walk_find_best(r)
+    assert n is exhaustive(s, r)
+    n.plant(r)
@@ -0,0 +1,36 @@
+import preamble
+import random
+from preamble import nonoverlap
+from repacker import *
+
+random.seed(20)
+tps = [(random.randint(1, 60), random.randint(1, 60))
+       for _ in range(300)]
+
+
+for by in ('size', 'chunk'):
+    rs = [Rectangle(*tp) for tp in tps]
+    s = plan_groups(rs, 100000, 100000, group_size=60, by=by, workers=1)
+    assert len(s.groups) >= 5
+    assert s.rects == rs
+    assert all(r.xy for r in rs)
+    nonoverlap(rs)
+
+    # Every rectangle lies within its group and the bounding box.
+    assert all(r.xy[0] + r.b <= s.x_bnd and r.xy[1] + r.h <= s.y_bnd
+               for r in rs)
+    area = sum(r.area for r in rs)
+    assert s.occu_rate == area / (s.x_bnd * s.y_bnd)
+    assert s.occu_rate > 0.7, s.occu_rate
+
+    # Dealt by size, groups hold at most `group_size` each.
+    if by == 'size':
+        for g in s.groups:
+            x, y = g.xy
+            assert sum(x <= r.xy[0] < x + g.b and y <= r.xy[1] < y + g.h
+                       for r in rs) <= 60
+
+# Workers do not change the plan.
+rs2 = [Rectangle(*tp) for tp in tps]
+s2 = plan_groups(rs2, 100000, 100000, group_size=60, by='chunk', workers=2)
+assert [r.xy for r in rs2] == [r.xy for r in rs]
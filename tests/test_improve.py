@@ -0,0 +1,43 @@
+import preamble
+import random
+from preamble import nonoverlap, planned
+from repacker import *
+
+random.seed(14)
+tps = [(random.randint(1, 60), random.randint(1, 60))
+       for _ in range(100)]
+
+
+s0 = planned(tps)
+s1 = planned(tps, improve=40)
+nonoverlap(s1.rects)
+assert s1.occu_rate >= s0.occu_rate
+assert s1.journal is None
+
+# The plan follows the improved order.
+s2 = Scene(100000, 100000)
+s2.rects = [Rectangle(r.b, r.h) for r in s1.rects]
+s2.plan()
+assert [r.xy for r in s2.rects] == [r.xy for r in s1.rects]
+
+# Under a tight budget, only the last positions are reordered.
+budget = Scene.IMPROVE_BUDGET
+Scene.IMPROVE_BUDGET = 500
+s3 = planned(tps, improve=40)
+Scene.IMPROVE_BUDGET = budget
+n = 0
+while n < len(tps) and (s3.rects[n].b, s3.rects[n].h) == (s0.rects[n].b, s0.rects[n].h):
+    n += 1
+assert 32 <= n < len(tps)
+nonoverlap(s3.rects)
+
+# Rejected trials are restored rather than planted again, and trials
+# start toward the end: about 35 plants a trial here.
+plants = []
+_plant = Corner.plant
+Corner.plant = lambda n, r: plants.append(r) or _plant(n, r)
+s4 = planned(tps, improve=40)
+Corner.plant = _plant
+assert len(plants) - len(tps) < 40 * 50
+assert [r.xy for r in s4.rects] == [r.xy for r in s1.rects]
+s4.validate_linking()
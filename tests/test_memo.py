@@ -0,0 +1,25 @@
+import preamble
+import random
+from repacker import *
+
+random.seed(3)
+
+# Every memo access is checked against fresh computation.
+Corner.debug = True
+
+s = Scene(100000, 100000)
+rs = [Rectangle(random.randint(1, 60),
+                random.randint(1, 60))
+      for _ in range(200)]
+rs += [Rectangle(30, 30) for _ in range(30)]
+s.prepare(rs)
+s.plan()
+
+for n in s.top.walk():
+    if n is not s.top:
+        n.shape(), n.x_put(), n.y_put()
+        n.memo = None
+        assert n.memo is None
+        assert n.shape() == n._shape()
+
+Corner.debug = False
@@ -0,0 +1,37 @@
+import preamble
+import random
+from repacker import *
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+if numpy is not None:
+
+    random.seed(8)
+    tps = [(random.randint(1, 60), random.randint(1, 60))
+           for _ in range(300)]
+    tps += [(20, 20)] * 30
+
+    rs0 = [Rectangle(*tp) for tp in tps]
+    s0 = Scene(100000, 100000)
+    s0.prepare(rs0)
+    s0.plan()
+
+    rs1 = [Rectangle(*tp) for tp in tps]
+    s1 = Scene(100000, 100000, engine='numpy')
+    s1.prepare(rs1)
+    s1.plan()
+
+    # Same plan as the pure-Python search.
+    assert [r.xy for r in rs0] == [r.xy for r in rs1]
+    assert s0.occu_rate == s1.occu_rate
+
+    # Mirrored slots are exact, not just upper bounds.
+    e = s1.engine
+    assert set(e.rows) == set(s1.index)
+    for n, i in e.rows.items():
+        assert (e.cols['sx'][i], e.cols['sy'][i]) == n.slot()
+        assert (e.cols['xp'][i], e.cols['yp'][i]) == (n.x_put(), n.y_put())
+        assert e.cols['rank'][i] == n.rank
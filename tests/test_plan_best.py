@@ -0,0 +1,39 @@
+import preamble
+import random
+from repacker import *
+
+random.seed(11)
+tps = [(random.randint(1, 60), random.randint(1, 60))
+       for _ in range(150)]
+
+rs1 = [Rectangle(*tp) for tp in tps]
+s1 = plan_best(rs1, 100000, 100000, workers=1)
+
+rs2 = [Rectangle(*tp) for tp in tps]
+s2 = plan_best(rs2, 100000, 100000, workers=2)
+
+# The winner does not depend on the number of workers.
+assert s1.rates == s2.rates
+assert s1.order == s2.order
+assert [r.xy for r in rs1] == [r.xy for r in rs2]
+
+# The best one is returned, earliest on ties.
+assert s1.occu_rate == max(s1.rates)
+orders = default_orders()
+assert s1.order == orders[s1.rates.index(max(s1.rates))]
+assert all(r.xy for r in rs1)
+
+# Each order replays to the same plan.
+for order, rate in zip(orders, s1.rates):
+    s = plan_order([Rectangle(*tp) for tp in tps], 100000, 100000, order)
+    assert s.occu_rate == rate
+
+# The winner is replayed from its positions, not planned again.
+plans = []
+_plan = Scene.plan
+Scene.plan = lambda self, **kw: plans.append(self) or _plan(self, **kw)
+rs3 = [Rectangle(*tp) for tp in tps]
+s3 = plan_best(rs3, 100000, 100000, workers=1)
+Scene.plan = _plan
+assert len(plans) == len(s3.rates)
+assert [r.xy for r in rs3] == [r.xy for r in rs1]
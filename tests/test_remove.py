@@ -0,0 +1,97 @@
+import preamble
+import random
+from preamble import nonoverlap
+from repacker import *
+
+random.seed(24)
+tps = [(random.randint(1, 60), random.randint(1, 60))
+       for _ in range(120)]
+
+
+def chain(s):
+    return [(n.xy, n.left.xy, n.right.xy, n.up.xy, n.down.xy)
+            for n in s.top.walk()]
+
+
+rs = sorted(Rectangle(*tp) for tp in tps)[::-1]
+
+# Removing the latest plant restores the scene without it.
+s0 = Scene(100000, 100000)
+for r in rs[:-1]:
+    s0.add(Rectangle(r.b, r.h))
+s = Scene(100000, 100000)
+s.checkpoint()
+for r in rs:
+    s.add(r)
+assert s.remove(rs[-1])
+assert rs[-1].xy is None and rs[-1] not in s.rects
+assert chain(s) == chain(s0)
+assert s.xy_bounding() == s0.xy_bounding() and s.occu_rate == s0.occu_rate
+s.validate_linking()
+
+# A rectangle others rest on leaves a hole instead, found by searches.
+s = Scene(100000, 100000)
+s.checkpoint()
+a, b, c = Rectangle(10, 10), Rectangle(10, 10), Rectangle(4, 4)
+s.add(a)
+s.add(b)
+xy, b_xy = a.xy, b.xy
+before = chain(s)
+assert not s.remove(a)
+assert chain(s) == before
+assert [(h.x, h.y, h.b, h.h) for h in s.holes] == [xy + (10, 10)]
+assert s.rects == [b] and b.xy == b_xy
+assert s.occu_rate == 100 / (s.x_bnd * s.y_bnd)
+assert isinstance(s.walk_find_best(c), Hole)
+s.add(c)
+assert c.xy == xy and len(s.holes) == 2
+
+# Filling a hole is rolled back with the holes before.
+holes = list(s.holes)
+cp = s.checkpoint()
+d = Rectangle(2, 2)
+s.add(d)
+assert d.xy and s.holes != holes
+s.rollback(cp)
+assert d.xy is None and s.holes == holes
+
+# Holes sharing a side are merged.
+s = Scene(100000, 100000)
+a, b = Rectangle(10, 10), Rectangle(10, 10)
+s.add(a)
+s.add(b)
+s.add(Rectangle(20, 10))
+assert not s.remove(a) and not s.remove(b)
+assert [(h.x, h.y, h.b, h.h) for h in s.holes] in ([(0, 0, 20, 10)],
+                                                   [(0, 0, 10, 20)])
+
+# Removing in random order, with the journal on or off.
+for seed in range(20):
+    rnd = random.Random(seed)
+    tps = [(rnd.randint(1, 60), rnd.randint(1, 60)) for _ in range(100)]
+    rs = [Rectangle(*tp) for tp in tps]
+    s = Scene(100000, 100000)
+    s.prepare(rs)
+    if seed % 2:
+        s.checkpoint()
+    s.plan()
+    bnd = s.xy_bounding()
+    gone = rnd.sample(rs, 10)
+    for r in gone:
+        pos = {id(q): q.xy for q in s.rects if q is not r}
+        exact = s.remove(r)
+        assert seed % 2 or not exact
+        assert r.xy is None and r not in s.rects
+        assert all(q.xy == pos[id(q)] for q in s.rects)
+        s.validate_linking()
+    nonoverlap(s.rects, s.holes)
+    assert len(s.rects) == 90
+
+    # The freed space is planted again without growing the bounding.
+    area = sum(h.b * h.h for h in s.holes)
+    for r in gone:
+        assert s.add(Rectangle(r.b, r.h))
+    nonoverlap(s.rects, s.holes)
+    assert all(r.xy for r in s.rects) and len(s.rects) == 100
+    if not s.journal or not area:
+        assert s.xy_bounding() == bnd
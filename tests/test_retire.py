@@ -0,0 +1,26 @@
+from test_align_merge import *
+
+# Corners with zero-area slots are retired from the index, but stay
+# along the chain.
+assert n6.slot()[0] * n6.slot()[1] == 0
+assert n6 in s.retired and n6 not in set(s.index)
+assert n7 in s.retired and n7 not in set(s.index)
+assert n6 in list(top.walk())
+assert n7 in list(top.walk())
+for n in s.index:
+    dx, dy = n.slot()
+    assert dx > 0 and dy > 0
+
+# Expecting larger rectangles retires more corners ...
+s.expect(15, 15)
+assert n5 in s.retired          # slot (30, 10)
+assert n9 in s.retired          # slot (50, 3)
+assert n8 in set(s.index)       # slot (15, 37)
+
+# ... and a smaller one brings them back.
+r = Rectangle(5, 5)
+n = s.walk_find_best(r)
+assert (s.b_min, s.h_min) == (5, 5)
+assert n5 in set(s.index)
+assert n9 not in set(s.index)   # still too low
+assert n6 in s.retired
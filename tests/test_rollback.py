@@ -0,0 +1,72 @@
+import preamble
+import random
+from repacker import *
+
+random.seed(13)
+tps = [(random.randint(1, 60), random.randint(1, 60))
+       for _ in range(200)]
+
+
+def state(s):
+    "Pointers along the chain and the indexed corners."
+    chain = [(n.xy, n.left.xy, n.right.xy, n.up.xy, n.down.xy, n.shape())
+             for n in s.top.walk()]
+    return chain, sorted(n.xy for n in s.index), s.xy_bounding()
+
+
+def planted(k, **kw):
+    rs = [Rectangle(*tp) for tp in tps]
+    s = Scene(100000, 100000, **kw)
+    s.prepare(rs)
+    s.expect(1, 1)
+    for r in s.rects[:k]:
+        s.walk_find_best(r).plant(r)
+    return s
+
+
+for kw in ({}, {'engine': 'numpy'}):
+    try:
+        s = planted(120, **kw)
+    except ImportError:
+        continue
+    ref = planted(120, **kw)
+
+    # Rolling back restores the state at the checkpoint.
+    cp = s.checkpoint()
+    for r in s.rects[120:]:
+        s.walk_find_best(r).plant(r)
+    xys = [r.xy for r in s.rects]
+    s.rollback(cp)
+    assert state(s) == state(ref)
+    assert all(r.xy is None for r in s.rects[120:])
+
+    # Replanning after rollback yields the same plan.
+    for r in s.rects[120:]:
+        s.walk_find_best(r).plant(r)
+    assert [r.xy for r in s.rects] == xys
+
+    # Nested checkpoints, rolled back innermost first.
+    s.rollback(cp)
+    cp1 = s.checkpoint()
+    for r in s.rects[120:160]:
+        s.walk_find_best(r).plant(r)
+    cp2 = s.checkpoint()
+    mid = state(s)
+    for r in s.rects[160:]:
+        s.walk_find_best(r).plant(r)
+    s.rollback(cp2)
+    assert state(s) == mid
+    s.rollback(cp1)
+    assert state(s) == state(ref)
+    s.release()
+    assert s.journal is None
+
+# Grid blocks are undone as well.
+rs = [Rectangle(5, 5) for _ in range(30)] + [Rectangle(7, 3) for _ in range(3)]
+s = Scene(100000, 100000)
+s.prepare(rs)
+cp = s.checkpoint()
+s.plan(batch=True)
+s.rollback(cp)
+assert all(r.xy is None for r in rs)
+assert [n.xy for n in s.top.walk()] == [(100000, 100000), (0, 0)]
@@ -0,0 +1,42 @@
+import preamble
+import random
+from preamble import nonoverlap
+from repacker import *
+
+random.seed(18)
+tps = [(random.randint(1, 60), random.randint(1, 60))
+       for _ in range(100)]
+
+
+# A rectangle fitting only when rotated.
+s = Scene(10, 100)
+r = Rectangle(100, 10, rotatable=True)
+s.walk_find_best(r).plant(r)
+assert r.rotated and (r.b, r.h) == (10, 100)
+assert r.xy == (0, 0)
+r = Rectangle(100, 10)
+assert not s.walk_find_best(r).can_plant(r, 10, 100)
+
+# Rotated rectangles keep their sizes and do not overlap.
+rs = [Rectangle(b, h, rotatable=True) for b, h in tps]
+s = Scene(100000, 100000)
+s.prepare(rs)
+rate = s.plan()
+assert any(r.rotated for r in rs)
+for r, (b, h) in zip(rs, tps):
+    assert (r.b, r.h) == ((h, b) if r.rotated else (b, h))
+nonoverlap(rs)
+
+# Beams and the local search rotate as well.
+for kw in ({'beam': 2}, {'improve': 20}):
+    rs = [Rectangle(b, h, rotatable=True) for b, h in tps]
+    s = Scene(100000, 100000)
+    s.prepare(rs)
+    s.plan(**kw)
+    nonoverlap(rs)
+
+# Replanning the improved order yields the same plan.
+s2 = Scene(100000, 100000)
+s2.rects = [Rectangle(*tps[rs.index(r)], rotatable=True) for r in s.rects]
+s2.plan()
+assert [(r.xy, r.rotated) for r in s2.rects] == [(r.xy, r.rotated) for r in s.rects]
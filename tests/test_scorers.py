@@ -0,0 +1,45 @@
+import preamble
+import random
+from preamble import nonoverlap
+from repacker import *
+
+random.seed(12)
+tps = [(random.randint(1, 60), random.randint(1, 60))
+       for _ in range(150)]
+
+
+# The default scorer is the original assessment.
+assert type(SCORERS['default']) is Scorer
+assert Scene(10, 10).scorer is SCORERS['default']
+
+# Every registered scorer yields a valid plan.
+for name in SCORERS:
+    rs = [Rectangle(*tp) for tp in tps]
+    s = plan_order(rs, 100000, 100000, ('area', 0), name)
+    assert s.scorer is SCORERS[name]
+    nonoverlap(rs)
+
+
+# Custom scorers are registered by name.
+@register_scorer
+class TopScorer(Scorer):
+    name = 'top'
+    by_distance = False
+
+    def tie_break(self, n, rect, x_bnd1, y_bnd1):
+        return (-n.y, n.x)
+
+
+rs = [Rectangle(*tp) for tp in tps]
+s = Scene(100000, 100000, scorer='top')
+s.prepare(rs)
+s.plan()
+nonoverlap(rs)
+del SCORERS['top']
+
+# The portfolio picks the best scorer, earliest on ties.
+rs = [Rectangle(*tp) for tp in tps]
+s = plan_portfolio(rs, 100000, 100000, workers=1)
+assert len(s.rates) == len(SCORERS)
+assert s.occu_rate == max(s.rates)
+assert s.scorer_name == list(SCORERS)[s.rates.index(max(s.rates))]
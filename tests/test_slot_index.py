@@ -0,0 +1,34 @@
+import preamble
+import random
+from repacker import *
+
+random.seed(2)
+
+s = Scene(100000, 100000)
+
+rs = [Rectangle(random.randint(1, 60),
+                random.randint(1, 60))
+      for _ in range(200)]
+rs += [Rectangle(20, 20) for _ in range(30)]
+s.prepare(rs)
+
+for r in s.rects:
+    # Every viable corner along the chain is found by the index.
+    w = s.top.walk()
+    next(w)
+    ns = [n for n in w if n.can_plant(r, s.x_max, s.y_max)]
+    assert set(ns) <= set(s.index.fits(r.b, r.h))
+    n = s.walk_find_best(r)
+    if ns:
+        assert n in ns
+    n.plant(r)
+
+# Exactly the corners along the chain (but `top`) are indexed or
+# retired.
+assert set(s.index) | set(s.retired) == set(s.top.walk()) - {s.top}
+assert not set(s.index) & set(s.retired)
+
+# Ranks are increasing along the chain.
+ranks = [n.rank for n in s.top.walk()]
+assert ranks == sorted(ranks)
+assert len(set(ranks)) == len(ranks)
@@ -0,0 +1,42 @@
+import preamble
+import random
+import time
+from preamble import nonoverlap
+from repacker import *
+
+random.seed(16)
+tps = [(random.randint(1, 60), random.randint(1, 60))
+       for _ in range(60)]
+
+
+# Without a time limit, the greedy plan.
+s0 = Scene(100000, 100000)
+s0.prepare([Rectangle(*tp) for tp in tps])
+s0.plan()
+rs = [Rectangle(*tp) for tp in tps]
+s = solve(rs, 100000, 100000)
+assert s.occu_rate == s0.occu_rate
+assert len(s.history) == 1
+
+# Improving until the time limit.
+rs = [Rectangle(*tp) for tp in tps]
+t = time.time()
+s = solve(rs, 100000, 100000, time_limit=1)
+assert time.time() - t < 2
+rates = [rate for _, rate in s.history]
+assert rates[0] == s0.occu_rate
+assert rates == sorted(rates)
+assert s.occu_rate == rates[-1]
+nonoverlap(rs)
+
+# The budget holds with runs longer than a fraction of it.
+tps2 = [(random.randint(1, 60), random.randint(1, 60))
+        for _ in range(1000)]
+rs = [Rectangle(*tp) for tp in tps2]
+t = time.time()
+s = solve(rs, 100000, 100000, time_limit=0.5)
+assert time.time() - t < 0.75
+assert s.rects and sorted(map(id, s.rects)) == sorted(map(id, rs))
+assert s.occu_rate == s.history[-1][1]
+assert s.occu_rate == sum(r.area for r in rs) / (s.x_bnd * s.y_bnd)
+nonoverlap(rs)
@@ -0,0 +1,79 @@
+import preamble
+import os
+import random
+import tempfile
+from preamble import nonoverlap
+from repacker import *
+
+random.seed(23)
+tps = [(random.randint(1, 60), random.randint(1, 60))
+       for _ in range(300)]
+
+
+rs = [Rectangle(*tp) for tp in tps]
+s = plan_order(rs, 100000, 100000, ('area', 0))
+placements = [[r.xy, r.xy2] for r in rs]
+
+# Unchanged input replays the former plan.
+rs1 = [Rectangle(*tp) for tp in tps]
+w = warm_start(rs1, placements, 100000, 100000)
+assert len(w.kept) == len(rs1) and not w.added and not w.removed
+assert [r.xy for r in rs1] == [r.xy for r in rs]
+assert w.xy_bounding() == s.xy_bounding() and w.occu_rate == s.occu_rate
+
+# The largest one removed leaves a hole for smaller ones added.
+big = max(range(len(tps)), key=lambda i: rs[i].area)
+small = (rs[big].b // 2, rs[big].h // 2)
+tps2 = tps[:big] + tps[big + 1:] + [small, small]
+rs2 = [Rectangle(*tp) for tp in tps2]
+w = warm_start(rs2, placements, 100000, 100000)
+assert len(w.kept) == len(tps) - 1 and len(w.removed) == 1
+assert sorted(map(id, w.added)) == sorted(map(id, rs2[-2:]))
+x0, y0 = rs[big].xy
+for r in rs2[-2:]:
+    assert x0 <= r.xy[0] and r.xy[0] + r.b <= x0 + rs[big].b
+    assert y0 <= r.xy[1] and r.xy[1] + r.h <= y0 + rs[big].h
+assert w.xy_bounding() == s.xy_bounding()
+assert [r.xy for r in rs2[:-2]] == [r.xy for r in rs[:big] + rs[big + 1:]]
+nonoverlap(rs2)
+
+# Changing a few percent, through files.
+tps3 = tps[10:] + [(random.randint(1, 60), random.randint(1, 60))
+                   for _ in range(10)]
+d = tempfile.mkdtemp()
+inp0, out0 = os.path.join(d, 'in0'), os.path.join(d, 'out0')
+inp1, out1 = os.path.join(d, 'in1'), os.path.join(d, 'out1')
+with open(inp0, 'w') as o:
+    o.write(repr(tps))
+with open(inp1, 'w') as o:
+    o.write(repr(tps3))
+solve_file(inp0, out0)
+solve_file(inp1, out1, warm=out0)
+res0, res1 = Gen.from_file(out0), Gen.from_file(out1)
+assert res1[:-10] == res0[10:]
+rs3 = [Rectangle(*tp) for tp in tps3]
+for r, (xy, _) in zip(rs3, res1):
+    r.xy = xy
+nonoverlap(rs3)
+with open(out1) as o:
+    assert '# Warm start from "{}": kept 290, added 10, removed 10\n'.format(out0) in o.read()
+
+# Placements at the same position are matched once.
+rs4 = [Rectangle(*tp) for tp in tps]
+w = warm_start(rs4, placements + placements[:5], 100000, 100000)
+assert len(w.kept) == len(tps) and not w.added and not w.removed
+assert [r.xy for r in rs4] == [r.xy for r in rs]
+
+# Replaying rectangles at the same position plants one of them.
+s = Scene(100, 100)
+a, b = Rectangle(10, 10), Rectangle(10, 10)
+a.xy = b.xy = (0, 0)
+assert s.replay([a, b]) == [b] and a.xy == (0, 0) and b.xy is None
+
+# Bins are another schema.
+bins_out = [[r.xy, r.xy2, 0] for r in rs]
+try:
+    warm_start([Rectangle(*tp) for tp in tps], bins_out, 100000, 100000)
+    assert False
+except Exception as e:
+    assert 'single plan' in str(e)